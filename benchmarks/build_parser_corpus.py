@@ -0,0 +1,168 @@
+"""Build the airconStat corpus used by parser_benchmark.py.
+
+The frames are put together from the protocol layout the parser implements:
+two segments of 18 status bytes, a record count, 4-byte records and a CRC16.
+They cover every ModelNr, operation mode, fan speed and wind direction, error
+codes, units with and without the Electric counter and long record sections.
+Frames captured from real units can be added to the corpus by hand, with
+their expected values, and are kept when the corpus is rebuilt. So are the
+"known-answer" frames, whose expected values come from the parser before it
+was optimized and catch a change of the decoded or encoded values.
+
+The expected values of the synthesized frames are those of the current
+parser, so only rebuild the corpus when a change of the parser output is
+intended. With --check the corpus is only compared with a rebuild of it.
+
+    python benchmarks/build_parser_corpus.py [--output FILE] [--check]
+"""
+
+import argparse
+from base64 import b64encode
+import json
+from pathlib import Path
+import random
+import sys
+
+import wfrac_loader
+
+ROOT = Path(__file__).resolve().parent
+wfrac_loader.load_wfrac()
+
+# pylint: disable=wrong-import-position
+from wfrac.models.aircon import AirconStat  # noqa: E402
+from wfrac.rac_parser import RacParser  # noqa: E402
+
+CORPUS = ROOT / "parser_corpus.json"
+
+_PARSER = RacParser()
+
+
+class _Values:
+    """Plain airco values to build an AirconStat from"""
+
+    def __init__(self, **values) -> None:
+        self.__dict__.update(values)
+
+
+def _segment(stat: bytearray, records: list[tuple[int, int, int, int]]) -> bytes:
+    body = bytearray(stat) + bytearray([len(records)])
+    for record in records:
+        body += bytearray(record)
+    return bytes(_PARSER.add_crc16(body))
+
+
+def _frame(values: _Values, error: int, records) -> str:
+    stat = AirconStat(values)
+    command = _segment(_PARSER.command_to_byte(stat), [(0, 0, 0, 0)])
+    receive = _PARSER.recieve_to_bytes(stat)
+    receive[6] = error
+    return b64encode(command + _segment(receive, records)).decode()
+
+
+def _records(rng: random.Random, electric: int | None, extra: int):
+    records = [
+        (0x80, 0x10, rng.randrange(256), 0),  # outdoor temperature
+        (0x80, 0x20, rng.randrange(256), 0),  # indoor temperature
+    ]
+    if electric is not None:
+        records.append((0x94, 0x10, electric & 255, electric >> 8))
+    for _ in range(extra):
+        # records the parser skips, with tags it does not know
+        records.append((rng.choice((0x80, 0x81, 0x90, 0x94)), 0x40, 0, 0))
+    rng.shuffle(records)
+    return records
+
+
+def build() -> list[dict]:
+    """Synthesized corpus cases, deterministic"""
+    rng = random.Random(20240701)
+    cases = []
+    # raw error code bytes, the high bit set ones are the E codes
+    errors = [0, 0, 0, 1, 7, 128 | 1, 128 | 16, 128 | 40]
+    for model_nr in (0, 1, 2):
+        for mode in range(5):
+            for variant in range(4):
+                electric = None if variant == 0 else rng.randrange(1 << 16)
+                extra = (0, 2, 12, 40)[variant]
+                error = rng.choice(errors)
+                values = _Values(
+                    Operation=rng.random() < 0.7,
+                    OperationMode=mode,
+                    AirFlow=rng.randrange(5),
+                    WindDirectionUD=rng.randrange(5),
+                    WindDirectionLR=rng.randrange(8),
+                    PresetTemp=rng.randrange(32, 61) / 2,
+                    Entrust=rng.random() < 0.3,
+                    ModelNr=model_nr,
+                    Vacant=rng.random() < 0.2,
+                    CoolHotJudge=rng.random() < 0.5,
+                )
+                cases.append(
+                    {
+                        "name": f"model{model_nr}-mode{mode}-{variant}",
+                        "source": "synthesized",
+                        "airconStat": _frame(
+                            values, error, _records(rng, electric, extra)
+                        ),
+                    }
+                )
+    return cases
+
+
+def expected(case: dict) -> dict:
+    """Expected decoded values and re-encoded command of a case"""
+    aircon = _PARSER.translate_bytes(case["airconStat"])
+    return {
+        **case,
+        "decoded": vars(aircon),
+        "command": _PARSER.to_base64(AirconStat(aircon)),
+    }
+
+
+def rebuild(corpus: Path) -> list[dict]:
+    """The corpus cases rebuilt, keeping the cases that were not synthesized"""
+    kept = []
+    if corpus.exists():
+        kept = [
+            case
+            for case in json.loads(corpus.read_text(encoding="utf-8"))["cases"]
+            if case.get("source") != "synthesized"
+        ]
+    return [expected(case) for case in build()] + kept
+
+
+def _dump(cases: list[dict]) -> str:
+    # sorted keys, so a rebuild without changes gives the same file
+    return (
+        json.dumps({"cases": cases}, indent=2, ensure_ascii=False, sort_keys=True)
+        + "\n"
+    )
+
+
+def main() -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--output", type=Path, default=CORPUS)
+    args.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with status 1 when the corpus differs from a rebuild",
+    )
+    options = args.parse_args()
+
+    cases = rebuild(options.output)
+    corpus = _dump(cases)
+    if options.check:
+        if not options.output.exists() or (
+            options.output.read_text(encoding="utf-8") != corpus
+        ):
+            print(f"{options.output} is not up to date")
+            return 1
+        print(f"{options.output} is up to date")
+        return 0
+    options.output.write_text(corpus, encoding="utf-8")
+    print(f"Wrote {len(cases)} cases to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Check the parser against the frame corpus and time it.
+
+Every frame in parser_corpus.json is decoded with RacParser.translate_bytes
+and encoded again with RacParser.to_base64. The output has to match the
+corpus exactly, and the median time per frame has to stay within the budget
+in parser_budget.json. Exits with status 1 when either fails.
+
+    python benchmarks/parser_benchmark.py [--rounds N]
+"""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+
+import wfrac_loader
+
+ROOT = Path(__file__).resolve().parent
+wfrac_loader.load_wfrac()
+
+# pylint: disable=wrong-import-position
+from wfrac.models.aircon import AirconStat  # noqa: E402
+from wfrac.rac_parser import RacParser  # noqa: E402
+
+CORPUS = ROOT / "parser_corpus.json"
+BUDGET = ROOT / "parser_budget.json"
+
+
+def check_output(parser: RacParser, cases: list[dict]) -> list[str]:
+    """Return a description of every case that does not match the corpus"""
+    failures = []
+    for case in cases:
+        aircon = parser.translate_bytes(case["airconStat"])
+        if vars(aircon) != case["decoded"]:
+            failures.append(f"{case['name']}: decoded {vars(aircon)}")
+            continue
+        command = parser.to_base64(AirconStat(aircon))
+        if command != case["command"]:
+            failures.append(f"{case['name']}: encoded {command}")
+    return failures
+
+
+def time_per_frame(func, frames: list, rounds: int) -> float:
+    """Median time in microseconds of func over all frames, per frame"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            func(frame)
+        timings.append((time.perf_counter() - start) / len(frames))
+    return statistics.median(timings) * 1_000_000
+
+
+def main() -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--rounds", type=int, default=50)
+    options = args.parse_args()
+
+    cases = json.loads(CORPUS.read_text(encoding="utf-8"))["cases"]
+    budget = json.loads(BUDGET.read_text(encoding="utf-8"))
+    parser = RacParser()
+
+    failures = check_output(parser, cases)
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+
+    frames = [case["airconStat"] for case in cases]
+    stats = [AirconStat(parser.translate_bytes(frame)) for frame in frames]
+    results = {
+        "translate_bytes": time_per_frame(
+            parser.translate_bytes, frames, options.rounds
+        ),
+        "to_base64": time_per_frame(parser.to_base64, stats, options.rounds),
+    }
+
+    for name, micros in results.items():
+        limit = budget[f"{name}_us"]
+        status = "ok" if micros <= limit else "OVER BUDGET"
+        print(f"{name:16} {micros:8.1f} us/frame (budget {limit} us) {status}")
+        if micros > limit:
+            failures.append(name)
+
+    print(f"{len(cases)} frames, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Time importing the integration and setting up its config entries.
+
+Every module is imported in a fresh interpreter, the median time and the
+modules it pulled in are reported. Exits with status 1 when an import pulls
+in a module it should not: the wfrac client has to stay free of Home
+Assistant, voluptuous and aiohttp, which only HttpTransport needs, and
+nothing may load aenum, zeroconf or, through the recorder, SQLAlchemy. The
+integration modules are only timed when Home Assistant is installed, on top
+of the Home Assistant modules every integration gets for free.
+
+The setup part runs what async_setup_entry does for the airco itself, the
+first poll and preparing the preset frames, for a growing number of entries
+at once against replayed replies. The entity platforms need a running Home
+Assistant and are not included.
+
+    python benchmarks/setup_benchmark.py [--rounds N] [--units 1 10 100]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+import wfrac_loader
+
+ROOT = Path(__file__).resolve().parent
+wfrac_loader.load_wfrac()
+
+# pylint: disable=wrong-import-position
+from wfrac.device import Device  # noqa: E402
+from wfrac.models.aircon import AirconCommands  # noqa: E402
+from wfrac.transport import ReplayTransport  # noqa: E402
+
+CORPUS = ROOT / "parser_corpus.json"
+
+# module, how it is made importable, modules it may not pull in
+CLIENT_MODULES = [
+    (
+        name,
+        "import wfrac_loader; wfrac_loader.load_wfrac()",
+        {"aenum", "aiohttp", "homeassistant", "voluptuous", "zeroconf"},
+    )
+    for name in (
+        "wfrac.models.aircon",
+        "wfrac.rac_parser",
+        "wfrac.transport",
+        "wfrac.device",
+    )
+]
+INTEGRATION_MODULES = [
+    (
+        f"custom_components.mitsubishi_wf_rac{name}",
+        f"sys.path.append({str(ROOT.parent)!r})",
+        {"aenum", "sqlalchemy", "zeroconf"},
+    )
+    for name in ("", ".climate", ".number", ".select", ".sensor")
+]
+# already imported by Home Assistant before any integration is loaded
+PRELOADED = ["homeassistant.core", "homeassistant.helpers.config_validation"]
+
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+{setup}
+for name in {preloaded!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module({module!r})
+seconds = time.perf_counter() - start
+added = sorted({{name.partition(".")[0] for name in set(sys.modules) - before}})
+print(json.dumps({{"seconds": seconds, "added": added}}))
+"""
+
+PRESET_PARAMS = {
+    AirconCommands.Operation: True,
+    AirconCommands.PresetTemp: 21.0,
+    AirconCommands.AirFlow: 0,
+    AirconCommands.WindDirectionUD: 1,
+    AirconCommands.WindDirectionLR: 3,
+    AirconCommands.Entrust: False,
+}
+
+
+def time_import(module: str, setup: str, preloaded: list[str], rounds: int):
+    """Median import time in ms and the top level modules that were added"""
+    script = _IMPORT_SCRIPT.format(setup=setup, preloaded=preloaded, module=module)
+    timings = []
+    added: list[str] = []
+    for _ in range(rounds):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            cwd=ROOT,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        timings.append(result["seconds"])
+        added = result["added"]
+    return statistics.median(timings) * 1000, added
+
+
+def check_imports(rounds: int) -> list[str]:
+    """Time every module, return a description of every forbidden import"""
+    modules = [(*module, []) for module in CLIENT_MODULES]
+    if importlib.util.find_spec("homeassistant") is None:
+        print("homeassistant is not installed, skipping the integration modules")
+    else:
+        modules += [(*module, PRELOADED) for module in INTEGRATION_MODULES]
+
+    failures = []
+    for module, setup, forbidden, preloaded in modules:
+        millis, added = time_import(module, setup, preloaded, rounds)
+        print(f"import {module:40} {millis:8.1f} ms {len(added):4d} packages")
+        if bad := forbidden.intersection(added):
+            failures.append(f"{module} imports {', '.join(sorted(bad))}")
+    return failures
+
+
+def replay_exchanges(frames: list[str], units: int) -> list[dict]:
+    """Status replies for units airco's, cycling through the corpus frames"""
+    return [
+        {
+            "host": f"10.0.{i // 250}.{i % 250 + 1}",
+            "port": 51443,
+            "command": "getAirconStat",
+            "response": {
+                "contents": {
+                    "airconStat": frames[i % len(frames)],
+                    "numOfAccount": 1,
+                    "firmType": "WF-RAC",
+                    "mcu": {"firmVer": "0"},
+                    "wireless": {"firmVer": "0"},
+                }
+            },
+        }
+        for i in range(units)
+    ]
+
+
+async def setup_entries(exchanges: list[dict], presets: int) -> float:
+    """Set up an airco for every exchange at once, return the seconds it took"""
+    transport = ReplayTransport(exchanges, speed=None)
+    start = time.perf_counter()
+    devices = [
+        Device(
+            transport,
+            f"airco {i}",
+            exchange["host"],
+            exchange["port"],
+            "device",
+            "operator",
+            f"airco{i}",
+        )
+        for i, exchange in enumerate(exchanges)
+    ]
+    await asyncio.gather(*(device.update() for device in devices))
+    for device in devices:
+        for preset in range(1, presets + 1):
+            device.set_frame_params(preset, PRESET_PARAMS)
+    seconds = time.perf_counter() - start
+    await asyncio.gather(*(device.async_close() for device in devices))
+    return seconds
+
+
+def main() -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--rounds", type=int, default=5)
+    args.add_argument("--units", type=int, nargs="+", default=[1, 10, 50, 100, 250])
+    args.add_argument("--presets", type=int, default=4)
+    options = args.parse_args()
+
+    failures = check_imports(options.rounds)
+
+    cases = json.loads(CORPUS.read_text(encoding="utf-8"))["cases"]
+    frames = [case["airconStat"] for case in cases]
+    for units in options.units:
+        exchanges = replay_exchanges(frames, units)
+        seconds = statistics.median(
+            asyncio.run(setup_entries(exchanges, options.presets))
+            for _ in range(options.rounds)
+        )
+        print(
+            f"setup  {units:4d} entries {seconds * 1000:10.1f} ms"
+            f" {seconds * 1000 / units:8.2f} ms/entry"
+        )
+
+    for failure in failures:
+        print(f"FORBIDDEN {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""Run the wfrac fleet poller from a checkout.
+
+    python benchmarks/wfrac_fleet.py units.json --rounds 10
+    python benchmarks/wfrac_fleet.py --replay traffic.jsonl --speed 100
+
+Takes the same arguments as the wfrac package's __main__, see
+custom_components/mitsubishi_wf_rac/wfrac/__main__.py.
+"""
+
+import runpy
+
+import wfrac_loader
+
+wfrac_loader.load_wfrac()
+runpy.run_module("wfrac", run_name="__main__", alter_sys=True)
@@ -0,0 +1,38 @@
+"""Make the wfrac client importable from a checkout, as the package wfrac.
+
+The client lives in the integration folder, next to the select and
+statistics platforms. Putting that folder on sys.path would let those
+shadow the standard library modules of the same name, so only the wfrac
+package itself is registered, from its folder.
+
+    import wfrac_loader
+
+    wfrac_loader.load_wfrac()
+    from wfrac.rac_parser import RacParser
+"""
+
+import importlib.util
+from pathlib import Path
+import sys
+from types import ModuleType
+
+PACKAGE = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "mitsubishi_wf_rac"
+    / "wfrac"
+)
+
+
+def load_wfrac() -> ModuleType:
+    """Import the wfrac package, once"""
+    if (module := sys.modules.get("wfrac")) is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(
+        "wfrac", PACKAGE / "__init__.py", submodule_search_locations=[str(PACKAGE)]
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["wfrac"] = module
+    spec.loader.exec_module(module)
+    return module
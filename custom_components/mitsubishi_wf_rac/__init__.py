@@ -1,27 +1,50 @@
 """The WF-RAC sensor integration."""  # pylint: disable=invalid-name
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
 import logging
+from typing import Any
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
 
 from homeassistant.const import (
     CONF_HOST, 
     CONF_PORT, 
     CONF_NAME, 
     CONF_DEVICE_ID, 
+    EVENT_HOMEASSISTANT_STOP,
     Platform,
 )
 from homeassistant.components.climate.const import HVACMode
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_AIRCO_ID, DOMAIN, CONF_OPERATOR_ID, NUMBER_OF_PRESET_MODES
-from .wfrac.device import Device
+from .const import (
+    ATTR_CHANGES,
+    CONF_AIRCO_ID,
+    DOMAIN,
+    EVENT_AIRCO_CHANGED,
+    CONF_OPERATOR_ID,
+    FAN_MODE_TRANSLATION,
+    HORIZONTAL_SWING_MODE_TRANSLATION,
+    NUMBER_OF_PRESET_MODES,
+    SWING_3D_AUTO,
+    SWING_HORIZONTAL_AUTO,
+    SWING_MODE_TRANSLATION,
+)
+from .wfrac.device import MIN_TIME_BETWEEN_UPDATES, Device
+from .wfrac.models.aircon import AirconCommands
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.CLIMATE, Platform.NUMBER, Platform.SELECT, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 @dataclass
 class PresetMode: 
     name: str
@@ -31,14 +54,133 @@ class PresetMode:
     hvac_mode: HVACMode
     temperature: float
 
+    def command_params(self) -> dict[str, Any]:
+        """Airco command parameters that activate this preset"""
+        if self.hvac_mode == HVACMode.OFF:
+            return {AirconCommands.Operation: False}
+
+        swing_auto = self.vertical_swing_mode == SWING_3D_AUTO
+        params: dict[str, Any] = {
+            AirconCommands.Operation: True,
+            AirconCommands.PresetTemp: self.temperature,
+            AirconCommands.AirFlow: FAN_MODE_TRANSLATION[self.fan_mode],
+            AirconCommands.WindDirectionLR: HORIZONTAL_SWING_MODE_TRANSLATION[
+                SWING_HORIZONTAL_AUTO if swing_auto else self.horizontal_swing_mode
+            ],
+            AirconCommands.Entrust: swing_auto,
+        }
+        # 3D auto keeps the current vertical wind direction
+        if not swing_auto:
+            params[AirconCommands.WindDirectionUD] = SWING_MODE_TRANSLATION[
+                self.vertical_swing_mode
+            ]
+        return params
+
+# every preset that turns the airco off matches the same state
+_PRESET_OFF_KEY = (HVACMode.OFF,)
+
+
+def _preset_state_key(
+    temperature: float | None,
+    fan_mode: str | None,
+    vertical_swing_mode: str | None,
+    horizontal_swing_mode: str | None,
+) -> tuple:
+    """Normalized climate state used to look up the matching preset mode"""
+    if vertical_swing_mode == SWING_3D_AUTO:
+        # 3D auto moves the horizontal swing as well, so ignore it
+        horizontal_swing_mode = None
+    return (temperature, fan_mode, vertical_swing_mode, horizontal_swing_mode)
+
+
 @dataclass
 class MitsubishiWfRacData:
     device: Device
     preset_modes: dict[int, PresetMode]
     current_preset_mode: str | None
+    preset_index: dict[tuple, tuple[int, str]] = field(default_factory=dict)
+    preset_listeners: list[Callable[[], None]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.update_presets()
+
+    def update_presets(self) -> None:
+        """Refresh everything derived from the presets, call after editing a preset"""
+        self.rebuild_preset_index()
+        for i, mode in self.preset_modes.items():
+            try:
+                params = mode.command_params()
+            except KeyError:
+                # not a complete preset (yet), nothing to prepare
+                self.device.remove_frame_params(i)
+                continue
+            self.device.set_frame_params(i, params)
+        for listener in list(self.preset_listeners):
+            listener()
+
+    def add_preset_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener after a preset changed, returns a function that removes it"""
+        self.preset_listeners.append(listener)
+
+        def remove_listener() -> None:
+            self.preset_listeners.remove(listener)
+
+        return remove_listener
+
+    def rebuild_preset_index(self) -> None:
+        """Rebuild the state to preset mode index"""
+        index: dict[tuple, tuple[int, str]] = {}
+        # walk backwards, so the first preset wins when two match the same state
+        for i, mode in sorted(self.preset_modes.items(), reverse=True):
+            key = (
+                _PRESET_OFF_KEY
+                if mode.hvac_mode == HVACMode.OFF
+                else _preset_state_key(
+                    mode.temperature,
+                    mode.fan_mode,
+                    mode.vertical_swing_mode,
+                    mode.horizontal_swing_mode,
+                )
+            )
+            index[key] = (i, mode.name)
+        self.preset_index = index
+
+    def find_preset_mode(  # pylint: disable=too-many-arguments
+        self,
+        hvac_mode: HVACMode | None,
+        temperature: float | None,
+        fan_mode: str | None,
+        vertical_swing_mode: str | None,
+        horizontal_swing_mode: str | None,
+    ) -> str | None:
+        """Return the name of the preset mode matching the climate state"""
+        match = self.preset_index.get(
+            _preset_state_key(
+                temperature, fan_mode, vertical_swing_mode, horizontal_swing_mode
+            )
+        )
+        if hvac_mode == HVACMode.OFF:
+            off_match = self.preset_index.get(_PRESET_OFF_KEY)
+            if off_match is not None and (match is None or off_match < match):
+                match = off_match
+        return match[1] if match is not None else None
 
 type MitsubishiWfRacConfigEntry = ConfigEntry[MitsubishiWfRacData]
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the domain services."""
+    # loaded once Home Assistant sets the domain up, not when it imports it
+    # pylint: disable=import-outside-toplevel
+    from .services import async_setup_services, async_stop_instrumentation
+
+    async_setup_services(hass)
+    hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STOP, partial(async_stop_instrumentation, hass)
+    )
+
+    return True
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate old config entry."""
 
@@ -57,6 +199,11 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: MitsubishiWfRacConfigEntry):
     """Establish connection with mitsubishi-wf-rac."""
+    # zeroconf and the recorder are only needed once an airco is set up
+    # pylint: disable=import-outside-toplevel
+    from .adapter import async_create_device
+    from .resolver import async_get_host_resolver
+    from .statistics import async_setup_energy_statistics
 
     device: str = entry.options[CONF_HOST]
     name: str = entry.data[CONF_NAME]
@@ -66,7 +213,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: MitsubishiWfRacConfigEnt
     airco_id: str = entry.data[CONF_AIRCO_ID]
 
     try:
-        api = Device(hass, name, device, port, device_id, operator_id, airco_id)
+        api = async_create_device(
+            hass, name, device, port, device_id, operator_id, airco_id
+        )
         await api.update()  # initial update to get fresh values
 
         default_names = {1: "home", 2: "comfort", 3: "boost", 4: "away"}
@@ -82,6 +231,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: MitsubishiWfRacConfigEnt
             for i in range(1, NUMBER_OF_PRESET_MODES + 1)
         }
         entry.runtime_data = MitsubishiWfRacData(api, preset_modes, None)
+        entry.async_on_unload(async_get_host_resolver(hass).async_register(entry))
+        entry.async_on_unload(api.add_listener(_async_fire_changed_event(hass, api)))
+        if (stop_statistics := async_setup_energy_statistics(hass, api)) is not None:
+            entry.async_on_unload(stop_statistics)
+
+        async def _async_poll(_now: datetime) -> None:
+            # the entities don't poll, they are told which fields changed
+            await api.update(no_throttle=True)
+
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                _async_poll,
+                MIN_TIME_BETWEEN_UPDATES,
+                name=f"{DOMAIN} poll {airco_id}",
+                cancel_on_shutdown=True,
+            )
+        )
     except Exception as ex:  # pylint: disable=broad-except
         _LOGGER.warning("Something whent wrong setting up device [%s] %s", device, ex)
 
@@ -89,12 +256,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: MitsubishiWfRacConfigEnt
 
     return True
 
+def _async_fire_changed_event(hass: HomeAssistant, device: Device):
+    """Return a listener that fires an event with the fields that changed"""
+
+    @callback
+    def _async_changed(changes: dict[str, Any]) -> None:
+        hass.bus.async_fire(
+            EVENT_AIRCO_CHANGED,
+            {
+                CONF_AIRCO_ID: device.airco_id,
+                CONF_NAME: device.name,
+                ATTR_CHANGES: changes,
+            },
+        )
+
+    return _async_changed
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: MitsubishiWfRacConfigEntry) -> bool:
     """Handle unload of entry."""
+    # pylint: disable=import-outside-toplevel
+    from .services import async_stop_instrumentation, async_stop_recording
 
     # Unload entities for this entry/device.
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
+    # Don't leave requests to the airco hanging around after unloading
+    if unload_ok:
+        async_stop_recording(hass, entry.runtime_data.device.repository)
+        await entry.runtime_data.device.async_close()
+        if not any(
+            other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ):
+            # nothing left to profile or time
+            async_stop_instrumentation(hass)
+
     return unload_ok
 
 
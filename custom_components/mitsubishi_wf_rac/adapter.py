@@ -0,0 +1,52 @@
+"""Glue between Home Assistant and the wfrac client."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import DOMAIN
+from .wfrac.device import Device
+from .wfrac.repository import Repository
+from .wfrac.transport import HttpTransport
+
+
+@callback
+def async_get_transport(hass: HomeAssistant) -> HttpTransport:
+    """Return a transport over the shared aiohttp session of Home Assistant"""
+    return HttpTransport(async_get_clientsession(hass))
+
+
+@callback
+def async_create_repository(  # pylint: disable=too-many-arguments
+    hass: HomeAssistant, host: str, port: int, operator_id: str, device_id: str
+) -> Repository:
+    """Return a repository to talk to the airco at host and port"""
+    return Repository(async_get_transport(hass), host, port, operator_id, device_id)
+
+
+@callback
+def async_create_device(  # pylint: disable=too-many-arguments
+    hass: HomeAssistant,
+    name: str,
+    host: str,
+    port: int,
+    device_id: str,
+    operator_id: str,
+    airco_id: str,
+) -> Device:
+    """Return a device for the airco at host and port"""
+    return Device(
+        async_get_transport(hass), name, host, port, device_id, operator_id, airco_id
+    )
+
+
+def device_info(device: Device) -> DeviceInfo:
+    """Return a device description for device registry."""
+    return {
+        "sw_version": device.firmware,
+        "identifiers": {(DOMAIN, device.airco_id)},
+        "manufacturer": "Mitsubishi (WF-RAC)",
+        "name": device.name,
+    }
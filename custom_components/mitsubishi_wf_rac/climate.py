@@ -6,23 +6,26 @@ from datetime import timedelta
 import logging
 from typing import Any
 
-from . import MitsubishiWfRacConfigEntry, MitsubishiWfRacData, PresetMode
+from . import MitsubishiWfRacConfigEntry, MitsubishiWfRacData
 import voluptuous as vol
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.components.climate.const import HVACMode, FAN_AUTO
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
-from homeassistant.core import HomeAssistant
-from homeassistant.util import Throttle
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.restore_state import RestoreEntity
 
-from .wfrac.device import MIN_TIME_BETWEEN_UPDATES, Device
+from .adapter import device_info
+from .entity import AircoEntity
+from .wfrac.device import FIELD_AVAILABLE, FRAME_OFF, FRAME_ON
 from .wfrac.models.aircon import AirconCommands
 from .const import (
     DOMAIN,
+    FAN_MODE_BY_VALUE,
     FAN_MODE_TRANSLATION,
+    HVAC_MODE_BY_VALUE,
     HVAC_TRANSLATION,
     SERVICE_SET_HORIZONTAL_SWING_MODE,
     SERVICE_SET_VERTICAL_SWING_MODE,
@@ -33,12 +36,16 @@ from .const import (
     SUPPORTED_FAN_MODES,
     SUPPORTED_HVAC_MODES,
     SWING_3D_AUTO,
+    SWING_MODE_BY_VALUE,
     SWING_MODE_TRANSLATION,
+    HORIZONTAL_SWING_MODE_BY_VALUE,
     HORIZONTAL_SWING_MODE_TRANSLATION,
 )
 
 _LOGGER = logging.getLogger(__name__)
 UPDATE_CONSOLIDATION_PERIOD = timedelta(milliseconds=500)
+# the airco fields the climate entity shows
+_DEVICE_FIELDS = {*AirconCommands, "IndoorTemp", FIELD_AVAILABLE}
 
 
 async def async_setup_entry(hass, entry: MitsubishiWfRacConfigEntry, async_add_entities):
@@ -66,7 +73,7 @@ async def async_setup_entry(hass, entry: MitsubishiWfRacConfigEntry, async_add_e
     )
 
 
-class AircoClimate(ClimateEntity, RestoreEntity):
+class AircoClimate(AircoEntity, ClimateEntity, RestoreEntity):
     """Representation of a climate entity"""
 
     _attr_supported_features: int = SUPPORT_FLAGS
@@ -80,6 +87,7 @@ class AircoClimate(ClimateEntity, RestoreEntity):
     _attr_min_temp: float = 16
     _attr_max_temp: float = 30
     _attr_horizontal_swing_mode: str | None = SWING_HORIZONTAL_AUTO
+    _fields = _DEVICE_FIELDS
     _enable_turn_on_off_backwards_compatibility = False  # Remove after HA 2025.1
 
     def __init__(self, data: MitsubishiWfRacData, hass: HomeAssistant) -> None:
@@ -88,15 +96,32 @@ class AircoClimate(ClimateEntity, RestoreEntity):
         self._hass = hass
 
         self._attr_name = self._device.name
-        self._attr_device_info = self._device.device_info
+        self._attr_device_info = device_info(self._device)
         self._attr_unique_id = f"{DOMAIN}-{self._device.airco_id}-climate"
         self._consolidated_params = {}
+        self._set_airco_tasks: set[asyncio.Task] = set()
         self._update_state()
 
     async def async_added_to_hass(self):
-        """Register for sensor updates."""
+        """Register for airco and preset updates."""
         self._data.current_preset_mode = self._data.preset_modes[1].name
-    
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._data.add_preset_listener(self._handle_preset_update)
+        )
+
+    @callback
+    def _handle_preset_update(self) -> None:
+        """Match the state against the presets again after one changed."""
+        self.determine_preset_mode()
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel pending consolidated commands when the entity is removed."""
+        for task in self._set_airco_tasks:
+            task.cancel()
+        self._consolidated_params.clear()
+
     @property
     def extra_state_attributes(self):
         return {
@@ -138,7 +163,7 @@ class AircoClimate(ClimateEntity, RestoreEntity):
 
     async def async_turn_on(self) -> None:
         """Turn the entity on."""
-        await self._set_airco({AirconCommands.Operation: True})
+        await self._send_frame(FRAME_ON)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new target hvac mode."""
@@ -196,28 +221,34 @@ class AircoClimate(ClimateEntity, RestoreEntity):
 
     async def async_turn_off(self) -> None:
         """Turn the entity off."""
-        await self._set_airco({AirconCommands.Operation: False})
+        await self._send_frame(FRAME_OFF)
+
+    async def _send_frame(self, key) -> None:
+        """Send a prepared command, unless it has to be merged with pending ones"""
+        if self._consolidated_params:
+            await self._set_airco(self._device.frame_params(key))
+        else:
+            await self._device.send_frame(key)
 
     async def _set_airco(self, params: dict[str, Any]) -> None:
         will_do_update = not self._consolidated_params
         self._consolidated_params.update(params)
 
         if will_do_update:
-            self._hass.async_create_task(self._set_airco_after_delay())
+            task = self._hass.async_create_task(self._set_airco_after_delay())
+            self._set_airco_tasks.add(task)
+            task.add_done_callback(self._set_airco_tasks.discard)
 
     async def _set_airco_after_delay(self):
         await asyncio.sleep(UPDATE_CONSOLIDATION_PERIOD.total_seconds())
         params = self._consolidated_params.copy()
         self._consolidated_params.clear()
         await self._device.set_airco(params)
-        self._update_state()
-        self.async_write_ha_state()
 
     @property
     def preset_mode(self):
         """Return the current preset mode"""
-        self.determine_preset_mode()
-        return self._data.current_preset_mode
+        return self._find_preset_mode()
 
     @property
     def preset_modes(self):
@@ -226,75 +257,27 @@ class AircoClimate(ClimateEntity, RestoreEntity):
 
     def determine_preset_mode(self) -> str | None:
         """Method to determine preset mode"""
-        # _LOGGER.error("Determine preset mode")
-
-        self._data.current_preset_mode = None
-        for mode in self._data.preset_modes.values():
-            # _LOGGER.error("Try mode: %s", mode[NAME])
-
-            if self._is_current_mode(mode):
-                # _LOGGER.error("Determined preset mode: %s", mode[NAME])
-                self._data.current_preset_mode = mode.name
-                break
-
-    def _is_current_mode(self, mode: PresetMode):
-        # _LOGGER.error("Is current mode %s?", mode.name)
-        if mode.hvac_mode == HVACMode.OFF:
-            return mode.hvac_mode == self._attr_hvac_mode
-        if mode.temperature != self._attr_target_temperature:
-            return False
-        if mode.fan_mode != self._attr_fan_mode:
-            return False
-        if mode.vertical_swing_mode != self._attr_swing_mode:
-            return False
-        if mode.vertical_swing_mode != SWING_3D_AUTO and mode.horizontal_swing_mode != self._attr_horizontal_swing_mode:
-            return False
-
-        return True
+        self._data.current_preset_mode = self._find_preset_mode()
+
+    def _find_preset_mode(self) -> str | None:
+        return self._data.find_preset_mode(
+            self._attr_hvac_mode,
+            self._attr_target_temperature,
+            self._attr_fan_mode,
+            self._attr_swing_mode,
+            self._attr_horizontal_swing_mode,
+        )
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new preset mode."""
         self._data.current_preset_mode = preset_mode
         # self.async_write_ha_state()
 
-        preset_mode_obj: PresetMode | None = next((obj for obj in self._data.preset_modes.values() if obj.name == preset_mode), None)
-        if preset_mode_obj is None:
+        i: int | None = next((i for i, obj in self._data.preset_modes.items() if obj.name == preset_mode), None)
+        if i is None:
             return
-        
-        if preset_mode_obj.hvac_mode == HVACMode.OFF:
-            await self.async_set_hvac_mode(preset_mode_obj.hvac_mode)
-        else:
-            opts = {
-                AirconCommands.Operation: True,
-                AirconCommands.PresetTemp: preset_mode_obj.temperature,
-                AirconCommands.AirFlow: FAN_MODE_TRANSLATION[preset_mode_obj.fan_mode],
-
-            }
-
-            vertical_swing_mode = preset_mode_obj.vertical_swing_mode
-            horizontal_swing_mode = preset_mode_obj.horizontal_swing_mode
-            _swing_auto = vertical_swing_mode == SWING_3D_AUTO
-            _swing_lr = (
-                HORIZONTAL_SWING_MODE_TRANSLATION[SWING_HORIZONTAL_AUTO]
-                if _swing_auto
-                else HORIZONTAL_SWING_MODE_TRANSLATION[horizontal_swing_mode]
-            )
-            _swing_ud = self._device.airco.WindDirectionUD
-
-            if vertical_swing_mode != SWING_3D_AUTO:
-                _swing_ud = SWING_MODE_TRANSLATION[vertical_swing_mode]
-
-            opts.update({
-                AirconCommands.WindDirectionUD: _swing_ud,
-                AirconCommands.WindDirectionLR: _swing_lr,
-                AirconCommands.Entrust: _swing_auto,
-            })
-
-            # _LOGGER.error(opts)
-
-            await self._device.set_airco(opts)
-            self._update_state()
 
+        await self._send_frame(i)
 
     def _update_state(self) -> None:
         """Private update attributes"""
@@ -307,7 +290,7 @@ class AircoClimate(ClimateEntity, RestoreEntity):
             airco.IndoorTemp if hasattr(airco, "IndoorTemp") else None
         )
         self._attr_fan_mode = (
-            list(FAN_MODE_TRANSLATION.keys())[airco.AirFlow]
+            FAN_MODE_BY_VALUE[airco.AirFlow]
             if hasattr(airco, "AirFlow")
             else None
         )
@@ -315,49 +298,22 @@ class AircoClimate(ClimateEntity, RestoreEntity):
             (
                 SWING_3D_AUTO
                 if airco.Entrust
-                else list(SWING_MODE_TRANSLATION.keys())[airco.WindDirectionUD]
+                else SWING_MODE_BY_VALUE[airco.WindDirectionUD]
             )
             if hasattr(airco, "Entrust") and hasattr(airco, "WindDirectionUD")
             else None
         )
         self._attr_horizontal_swing_mode = (
-            list(HORIZONTAL_SWING_MODE_TRANSLATION.keys())[airco.WindDirectionLR]
+            HORIZONTAL_SWING_MODE_BY_VALUE[airco.WindDirectionLR]
             if hasattr(airco, "WindDirectionLR")
             else None
         )
         self._attr_available = self._device.available
-        self._attr_hvac_mode = list(HVAC_TRANSLATION.keys())[airco.OperationMode] if hasattr(airco, 'OperationMode') else None
-
-        if hasattr(airco, 'Operation'):
-            if airco.Operation is False:
-                self._attr_hvac_mode = HVACMode.OFF
-            else:
-                _new_mode: HVACMode = HVACMode.OFF
-                _mode = airco.OperationMode
-                if _mode == 0:
-                    _new_mode = HVACMode.AUTO
-                elif _mode == 1:
-                    _new_mode = HVACMode.COOL
-                elif _mode == 2:
-                    _new_mode = HVACMode.HEAT
-                elif _mode == 3:
-                    _new_mode = HVACMode.FAN_ONLY
-                elif _mode == 4:
-                    _new_mode = HVACMode.DRY
-                self._attr_hvac_mode = _new_mode
-        else:
+        if not hasattr(airco, "Operation"):
             self._attr_hvac_mode = None
+        elif airco.Operation is False:
+            self._attr_hvac_mode = HVACMode.OFF
+        else:
+            self._attr_hvac_mode = HVAC_MODE_BY_VALUE[airco.OperationMode]
 
         self.determine_preset_mode()
-
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def async_update(self):
-        """Retrieve latest state."""
-        try:
-            await self._device.update()
-            self._update_state()
-        except Exception: # pylint: disable=broad-except
-            _LOGGER.warning("Could not update the airco values")
-            self._attr_available = False
-            self._device.set_available(False)
-            self.async_write_ha_state()
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from ipaddress import IPv4Network, ip_network
 import logging
 from typing import Any
 from uuid import uuid4
@@ -10,7 +12,7 @@ from functools import partial
 import voluptuous as vol
 
 import homeassistant.helpers.config_validation as cv
-from homeassistant.components import zeroconf
+from homeassistant.components import network, zeroconf
 from homeassistant import config_entries, exceptions
 from homeassistant.const import (
     CONF_HOST,
@@ -23,24 +25,116 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import CONF_OPERATOR_ID, CONF_AIRCO_ID, DOMAIN
-from .wfrac.repository import Repository
+from .adapter import async_create_repository
+from .const import (
+    CONF_OPERATOR_ID,
+    CONF_AIRCO_ID,
+    CONF_HOSTS,
+    CONF_NETWORK,
+    CONF_SERVICE_NAME,
+    DEFAULT_PORT,
+    DOMAIN,
+)
+from .discovery import airco_id_from_properties, async_get_discovery_cache
+from .resolver import async_get_host_resolver
+from .scanner import ScannedAirco, async_scan_network
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _find_entry_matching(hass: HomeAssistant, key, matches, options=False):
+    """Returns the first entry where matches(entry.data[key]) returns True
+
+    With options=True, entry.options is checked instead of entry.data.
+    """
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        values = entry.options if options else entry.data
+        if key in values and matches(values[key]):
+            return entry
+    return None
+
+
+@callback
+def async_get_operator_id(hass: HomeAssistant) -> str:
+    """Fetch UUID operator id if exists otherwise create it"""
+    entry = _find_entry_matching(hass, CONF_OPERATOR_ID, bool)
+    if entry:
+        return entry.data[CONF_OPERATOR_ID]
+    return f"hassio-{str(uuid4())[7:]}"
+
+
+@callback
+def async_get_device_id(hass: HomeAssistant) -> str:
+    """Fetch unique device id if exists otherwise create it"""
+    entry = _find_entry_matching(hass, CONF_DEVICE_ID, bool)
+    if entry:
+        return entry.data[CONF_DEVICE_ID]
+    return f"homeassistant-device-{uuid4().hex[21:]}"
+
+
+async def async_register_airco(hass: HomeAssistant, data: dict) -> dict[str, Any]:
+    """Validate the given data allows us to connect, and register with the airco device"""
+    if len(data[CONF_HOST]) < 3:
+        raise InvalidHost
+
+    if len(data[CONF_NAME]) < 3:
+        raise InvalidName
+
+    if not data.get(CONF_FORCE_UPDATE):
+        # Is this hostname or IP address already configured?
+        existing_entry = _find_entry_matching(
+            hass, CONF_HOST, lambda h: h == data[CONF_HOST], options=True
+        )
+        if existing_entry:
+            raise HostAlreadyConfigured(error_name=existing_entry.data[CONF_NAME])
+
+    repository = async_create_repository(
+        hass,
+        data[CONF_HOST],
+        data[CONF_PORT],
+        data[CONF_OPERATOR_ID],
+        data[CONF_DEVICE_ID],
+    )
+
+    try:
+        # zeroconf may already have told us the airco ID, saving a request
+        airco_id = data.get(CONF_AIRCO_ID) or await async_get_discovery_cache(
+            hass
+        ).async_get_airco_id(repository, data[CONF_HOST], data[CONF_PORT])
+    except Exception as query_failed:
+        raise CannotConnect(reason=str(query_failed)) from query_failed  # type: ignore
+
+    data[CONF_AIRCO_ID] = airco_id
+    if not airco_id:
+        raise CannotConnect(reason="unknown reason")  # type: ignore
+
+    _LOGGER.info(
+        "Trying to register OperatorId[%s] on Airco[%s]",
+        data[CONF_OPERATOR_ID],
+        data[CONF_AIRCO_ID],
+    )
+    result = await repository.update_account_info(airco_id, hass.config.time_zone)
+    if not result:
+        raise CannotConnect
+    if int(result["result"]) == 2:
+        raise TooManyDevicesRegistered
+
+    return data
+
+
 class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow."""
 
     VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
     _discovery_info = {}
+    _scanned: dict[str, ScannedAirco] = {}
     DOMAIN = DOMAIN
 
-    def _find_entry_matching(self, key, matches):
-        """Returns the first entry where matches(entry.data[key]) returns True"""
+    def _find_entry_with_unique_id(self, unique_id):
+        """Returns the entry with the given unique id"""
         for entry in self._async_current_entries():
-            if key in entry.data and matches(entry.data[key]):
+            if entry.unique_id == unique_id:
                 return entry
         return None
 
@@ -55,63 +149,15 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, hass: HomeAssistant, data: dict
     ) -> dict[str, Any]:
         """Validate the user input allows us to connect, and register with the airco device"""
-        if len(data[CONF_HOST]) < 3:
-            raise InvalidHost
-
-        if len(data[CONF_NAME]) < 3:
-            raise InvalidName
-
-        if not data.get(CONF_FORCE_UPDATE):
-            # Is this hostname or IP address already configured?
-            existing_entry = self._find_entry_matching_option(
-                CONF_HOST, lambda h: h == data[CONF_HOST]
-            )
-            if existing_entry:
-                raise HostAlreadyConfigured(error_name=existing_entry.data[CONF_NAME])
-
-        repository = Repository(
-            hass,
-            data[CONF_HOST],
-            data[CONF_PORT],
-            data[CONF_OPERATOR_ID],
-            data[CONF_DEVICE_ID],
-        )
-
-        try:
-            airco_id = await repository.get_airco_id()
-        except Exception as query_failed:
-            raise CannotConnect(reason=str(query_failed)) from query_failed  # type: ignore
-
-        data[CONF_AIRCO_ID] = airco_id
-        if not airco_id:
-            raise CannotConnect(reason="unknown reason")  # type: ignore
-
-        _LOGGER.info(
-            "Trying to register OperatorId[%s] on Airco[%s]",
-            data[CONF_OPERATOR_ID],
-            data[CONF_AIRCO_ID],
-        )
-        result = await repository.update_account_info(airco_id, hass.config.time_zone)
-        if not result:
-            raise CannotConnect
-        if int(result["result"]) == 2:
-            raise TooManyDevicesRegistered
-
-        return data
+        return await async_register_airco(hass, data)
 
     async def _async_fetch_operator_id(self):
         """Fetch UUID operator id if exists otherwise create it"""
-        entry = self._find_entry_matching(CONF_OPERATOR_ID, bool)
-        if entry:
-            return entry.data[CONF_OPERATOR_ID]
-        return f"hassio-{str(uuid4())[7:]}"
+        return async_get_operator_id(self.hass)
 
     async def _async_fetch_device_id(self):
         """Fetch unique device id if exists otherwise create it"""
-        entry = self._find_entry_matching(CONF_DEVICE_ID, bool)
-        if entry:
-            return entry.data[CONF_DEVICE_ID]
-        return f"homeassistant-device-{uuid4().hex[21:]}"
+        return async_get_device_id(self.hass)
 
     async def _async_create_common(
         self,
@@ -132,15 +178,7 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                 info = await self._async_register_airco(self.hass, user_input)
 
-                data_input = user_input.copy()
-                options_input = {CONF_HOST: user_input[CONF_HOST]}
-                data_input.pop(CONF_HOST)
-
-                return self.async_create_entry(
-                    title=info[CONF_NAME],
-                    data=data_input,
-                    options=options_input,
-                )
+                return self._async_create_airco_entry(info)
             except KnownError as error:
                 _LOGGER.exception("create failed")
                 errors, placeholders = error.get_errors_and_placeholders(
@@ -165,6 +203,18 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders=description_placeholders,
         )
 
+    @callback
+    def _async_create_airco_entry(self, info: dict[str, Any]):
+        """Create the entry for a registered airco, the host is an option"""
+        data_input = info.copy()
+        options_input = {CONF_HOST: data_input.pop(CONF_HOST)}
+
+        return self.async_create_entry(
+            title=info[CONF_NAME],
+            data=data_input,
+            options=options_input,
+        )
+
     @staticmethod
     def _field(user_input, name, which, default=None):
         """Helper for creating schema fields"""
@@ -184,8 +234,9 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
 
         if user_input:
-            for key in [CONF_HOST, CONF_PORT]:
-                user_input[key] = self._discovery_info[key]
+            for key in [CONF_HOST, CONF_PORT, CONF_AIRCO_ID, CONF_SERVICE_NAME]:
+                if key in self._discovery_info:
+                    user_input[key] = self._discovery_info[key]
 
         field = partial(self._field, user_input)
         data_schema = vol.Schema(
@@ -212,6 +263,10 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return WfRacOptionsFlowHandler(config_entry)
 
     async def async_step_user(self, user_input=None):
+        """Handle a flow started by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "scan"])
+
+    async def async_step_manual(self, user_input=None):
         """Handle adding device manually."""
 
         field = partial(self._field, user_input)
@@ -219,15 +274,146 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             {
                 field(CONF_NAME, vol.Required, "Airco unknown"): cv.string,
                 field(CONF_HOST, vol.Required): cv.string,
-                field(CONF_PORT, vol.Optional, 51443): cv.port,
+                field(CONF_PORT, vol.Optional, DEFAULT_PORT): cv.port,
                 field(CONF_FORCE_UPDATE, vol.Optional, False): cv.boolean,
             }
         )
 
         return await self._async_create_common(
-            step_id="user", data_schema=data_schema, user_input=user_input
+            step_id="manual", data_schema=data_schema, user_input=user_input
+        )
+
+    async def _async_suggested_network(self) -> str | None:
+        """Suggest the /24 network Home Assistant itself is in"""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return str(ip_network(f"{source_ip}/24", strict=False))
+
+    async def async_step_scan(self, user_input=None):
+        """Handle scanning a network range for airco's."""
+        errors = {}
+
+        if user_input:
+            try:
+                scan_network = ip_network(user_input[CONF_NETWORK], strict=False)
+                if not isinstance(scan_network, IPv4Network):
+                    raise ValueError("only IPv4 networks can be scanned")
+                scanned = await async_scan_network(
+                    self.hass,
+                    scan_network,
+                    user_input[CONF_PORT],
+                    await self._async_fetch_operator_id(),
+                    await self._async_fetch_device_id(),
+                )
+            except ValueError:
+                _LOGGER.warning("Invalid network to scan: %s", user_input[CONF_NETWORK])
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                configured_ids = {
+                    entry.data.get(CONF_AIRCO_ID)
+                    for entry in self._async_current_entries()
+                }
+                configured_hosts = {
+                    entry.options.get(CONF_HOST)
+                    for entry in self._async_current_entries()
+                }
+                self._scanned = {
+                    airco.host: airco
+                    for airco in scanned
+                    if airco.airco_id not in configured_ids
+                    and airco.host not in configured_hosts
+                }
+                if not self._scanned:
+                    return self.async_abort(reason="no_devices_found")
+                return await self.async_step_scan_select()
+
+        field = partial(self._field, user_input)
+        data_schema = vol.Schema(
+            {
+                field(
+                    CONF_NETWORK, vol.Required, await self._async_suggested_network()
+                ): cv.string,
+                field(CONF_PORT, vol.Optional, DEFAULT_PORT): cv.port,
+            }
+        )
+
+        return self.async_show_form(step_id="scan", data_schema=data_schema, errors=errors)
+
+    async def async_step_scan_select(self, user_input=None):
+        """Handle selecting which of the scanned airco's to add."""
+        errors = {}
+        description_placeholders = {"error_name": ""}
+
+        if user_input:
+            operator_id = await self._async_fetch_operator_id()
+            device_id = await self._async_fetch_device_id()
+            to_register = [
+                {
+                    CONF_NAME: f"Airco {self._scanned[host].airco_id}",
+                    CONF_HOST: host,
+                    CONF_PORT: self._scanned[host].port,
+                    CONF_AIRCO_ID: self._scanned[host].airco_id,
+                    CONF_OPERATOR_ID: operator_id,
+                    CONF_DEVICE_ID: device_id,
+                }
+                for host in user_input[CONF_HOSTS]
+            ]
+
+            # register all selected airco's at once instead of one after the other
+            results = await asyncio.gather(
+                *(self._async_register_airco(self.hass, data) for data in to_register),
+                return_exceptions=True,
+            )
+
+            registered = []
+            for data, result in zip(to_register, results):
+                if isinstance(result, BaseException):
+                    _LOGGER.warning(
+                        "Could not register airco at %s: %r", data[CONF_HOST], result
+                    )
+                    description_placeholders["error_name"] += f" {data[CONF_HOST]}"
+                else:
+                    registered.append(result)
+
+            if registered:
+                # this flow can only create one entry, the others are imported
+                for info in registered[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data=info,
+                        )
+                    )
+                return self._async_create_airco_entry(registered[0])
+
+            errors[CONF_BASE] = "scan_register_failed"
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_HOSTS, default=list(self._scanned)): cv.multi_select(
+                    {
+                        host: f"{airco.airco_id} ({host}:{airco.port})"
+                        for host, airco in self._scanned.items()
+                    }
+                ),
+            }
         )
 
+        return self.async_show_form(
+            step_id="scan_select",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders=description_placeholders,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]):
+        """Create an entry for an airco that is already registered."""
+        self._async_abort_entries_match({CONF_AIRCO_ID: import_data[CONF_AIRCO_ID]})
+        return self._async_create_airco_entry(import_data)
+
     async def async_step_zeroconf(
         self, discovery_info: zeroconf.ZeroconfServiceInfo
     ) -> FlowResult:
@@ -248,18 +434,60 @@ class WfRacConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         info = {CONF_HOST: host, CONF_PORT: port}
 
         await self.async_set_unique_id(node_name)
-        self._abort_if_unique_id_configured(updates=info)
+
+        airco_id = airco_id_from_properties(discovery_info.properties)
+        configured_entry = self._find_entry_with_unique_id(node_name)
+        if airco_id is None and configured_entry is not None:
+            airco_id = configured_entry.data.get(CONF_AIRCO_ID)
+
+        discovered = async_get_discovery_cache(self.hass).async_record(
+            node_name, host, port, airco_id, discovery_info.name
+        )
+        if discovered.airco_id:
+            # follow configured airco's to their new address without a reload
+            async_get_host_resolver(self.hass).async_host_discovered(
+                discovered.airco_id, host, discovery_info.name
+            )
+
+        self._abort_if_unique_id_configured(updates={CONF_PORT: port})
 
         existing_entry = self._find_entry_matching_option(CONF_HOST, lambda h: h == host)
         if existing_entry:
             _LOGGER.debug("already configured!")
             return self.async_abort(reason="already_configured")
 
+        if discovered.airco_id is None:
+            # look up the airco ID while the user confirms, so that many discovered
+            # units don't have to wait for each other when they get registered
+            self.hass.async_create_background_task(
+                self._async_prefetch_airco_id(host, port),
+                f"wf-rac prefetch airco id {host}",
+            )
+
         info[CONF_NAME] = node_name
+        info[CONF_SERVICE_NAME] = discovery_info.name
+        if discovered.airco_id:
+            info[CONF_AIRCO_ID] = discovered.airco_id
         self._discovery_info = info
 
         return await self.async_step_discovery_confirm()
 
+    async def _async_prefetch_airco_id(self, host: str, port: int) -> None:
+        """Fill the discovery cache with the airco ID of a discovered module"""
+        repository = async_create_repository(
+            self.hass,
+            host,
+            port,
+            await self._async_fetch_operator_id(),
+            await self._async_fetch_device_id(),
+        )
+        try:
+            await async_get_discovery_cache(self.hass).async_get_airco_id(
+                repository, host, port
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not prefetch airco id of %s", host, exc_info=True)
+
     @property
     def _name(self) -> str | None:
         return self.context.get(CONF_NAME)
@@ -1,5 +1,7 @@
 """Constants used by the mitsubishi-wf-rac component."""
 
+from types import MappingProxyType
+
 from homeassistant.const import CONF_ICON, CONF_NAME, CONF_TYPE
 from homeassistant.components.climate.const import (
     HVACMode,
@@ -9,10 +11,26 @@ from homeassistant.components.climate.const import (
 
 DOMAIN = "mitsubishi_wf_rac"
 DEVICES = "wf-rac-devices"
+DATA_DISCOVERY_CACHE = f"{DOMAIN}_discovery_cache"
+DATA_HOST_RESOLVER = f"{DOMAIN}_host_resolver"
+DATA_TRAFFIC_RECORDING = f"{DOMAIN}_traffic_recording"
+DATA_PROFILER = f"{DOMAIN}_profiler"
+DATA_STALL_DETECTOR = f"{DOMAIN}_stall_detector"
+ZEROCONF_TYPE = "_beaver._tcp.local."
+DEFAULT_PORT = 51443
+
+# fired with the changed fields whenever an airco reports a different state
+EVENT_AIRCO_CHANGED = f"{DOMAIN}_changed"
+ATTR_CHANGES = "changes"
+
+CONF_NETWORK = "network"
+CONF_HOSTS = "hosts"
 NUMBER_OF_PRESET_MODES = 4
 
 CONF_OPERATOR_ID = "operator_id"
 CONF_AIRCO_ID = "airco_id"
+# mDNS service name of the module, to ask it for its address when it moved
+CONF_SERVICE_NAME = "service_name"
 ATTR_DEVICE_ID = "device_id"
 ATTR_CONNECTED_ACCOUNTS = "connected_accounts"
 
@@ -37,6 +55,20 @@ SENSOR_TYPES = {
 
 SERVICE_SET_HORIZONTAL_SWING_MODE = "set_horizontal_swing_mode"
 SERVICE_SET_VERTICAL_SWING_MODE = "set_vertical_swing_mode"
+SERVICE_PROVISION = "provision"
+SERVICE_SEND_COMMAND = "send_command"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_RECORD_TRAFFIC = "record_traffic"
+SERVICE_PROFILE = "profile"
+SERVICE_DETECT_STALLS = "detect_stalls"
+
+ATTR_UNITS = "units"
+ATTR_MAX_PARALLEL = "max_parallel"
+ATTR_LIMIT = "limit"
+ATTR_DURATION = "duration"
+ATTR_TOP = "top"
+ATTR_ENABLED = "enabled"
+ATTR_THRESHOLD = "threshold"
 
 SUPPORT_FLAGS = (
     ClimateEntityFeature.FAN_MODE
@@ -56,13 +88,22 @@ SUPPORTED_HVAC_MODES = [
     HVACMode.FAN_ONLY,
 ]
 
-HVAC_TRANSLATION = {
-    HVACMode.AUTO: 0,
-    HVACMode.COOL: 1,
-    HVACMode.HEAT: 2,
-    HVACMode.FAN_ONLY: 3,
-    HVACMode.DRY: 4,
-}
+
+def _by_value(translation: MappingProxyType) -> tuple:
+    """Reverse a translation (with values 0..n-1) to a tuple indexed by value"""
+    return tuple(sorted(translation, key=translation.__getitem__))
+
+
+HVAC_TRANSLATION = MappingProxyType(
+    {
+        HVACMode.AUTO: 0,
+        HVACMode.COOL: 1,
+        HVACMode.HEAT: 2,
+        HVACMode.FAN_ONLY: 3,
+        HVACMode.DRY: 4,
+    }
+)
+HVAC_MODE_BY_VALUE = _by_value(HVAC_TRANSLATION)
 
 SWING_3D_AUTO = "3D Auto"
 SWING_VERTICAL_POSITION_1 = "Hoog"
@@ -81,13 +122,16 @@ SWING_HORIZONTAL_POSITION_7 = "Rechts-Links"
 SWING_HORIZONTAL_AUTO = "Links/Rechts Auto"
 
 
-SWING_MODE_TRANSLATION = {
-    SWING_VERTICAL_AUTO: 0,
-    SWING_VERTICAL_POSITION_1: 1,
-    SWING_VERTICAL_POSITION_2: 2,
-    SWING_VERTICAL_POSITION_3: 3,
-    SWING_VERTICAL_POSITION_4: 4,
-}
+SWING_MODE_TRANSLATION = MappingProxyType(
+    {
+        SWING_VERTICAL_AUTO: 0,
+        SWING_VERTICAL_POSITION_1: 1,
+        SWING_VERTICAL_POSITION_2: 2,
+        SWING_VERTICAL_POSITION_3: 3,
+        SWING_VERTICAL_POSITION_4: 4,
+    }
+)
+SWING_MODE_BY_VALUE = _by_value(SWING_MODE_TRANSLATION)
 
 SUPPORT_SWING_MODES = [
     SWING_VERTICAL_AUTO,
@@ -98,16 +142,19 @@ SUPPORT_SWING_MODES = [
     SWING_3D_AUTO,
 ]
 
-HORIZONTAL_SWING_MODE_TRANSLATION = {
-    SWING_HORIZONTAL_AUTO: 0,
-    SWING_HORIZONTAL_POSITION_1: 1,
-    SWING_HORIZONTAL_POSITION_2: 2,
-    SWING_HORIZONTAL_POSITION_3: 3,
-    SWING_HORIZONTAL_POSITION_4: 4,
-    SWING_HORIZONTAL_POSITION_5: 5,
-    SWING_HORIZONTAL_POSITION_6: 6,
-    SWING_HORIZONTAL_POSITION_7: 7,
-}
+HORIZONTAL_SWING_MODE_TRANSLATION = MappingProxyType(
+    {
+        SWING_HORIZONTAL_AUTO: 0,
+        SWING_HORIZONTAL_POSITION_1: 1,
+        SWING_HORIZONTAL_POSITION_2: 2,
+        SWING_HORIZONTAL_POSITION_3: 3,
+        SWING_HORIZONTAL_POSITION_4: 4,
+        SWING_HORIZONTAL_POSITION_5: 5,
+        SWING_HORIZONTAL_POSITION_6: 6,
+        SWING_HORIZONTAL_POSITION_7: 7,
+    }
+)
+HORIZONTAL_SWING_MODE_BY_VALUE = _by_value(HORIZONTAL_SWING_MODE_TRANSLATION)
 
 SUPPORT_HORIZONTAL_SWING_MODES = [
     SWING_HORIZONTAL_AUTO,
@@ -126,13 +173,16 @@ FAN_MODE_2 = "2 Laag"
 FAN_MODE_3 = "3 Hoog"
 FAN_MODE_4 = "4 Hoogst"
 
-FAN_MODE_TRANSLATION = {
-    FAN_AUTO: 0,
-    FAN_MODE_1: 1,
-    FAN_MODE_2: 2,
-    FAN_MODE_3: 3,
-    FAN_MODE_4: 4,
-}
+FAN_MODE_TRANSLATION = MappingProxyType(
+    {
+        FAN_AUTO: 0,
+        FAN_MODE_1: 1,
+        FAN_MODE_2: 2,
+        FAN_MODE_3: 3,
+        FAN_MODE_4: 4,
+    }
+)
+FAN_MODE_BY_VALUE = _by_value(FAN_MODE_TRANSLATION)
 
 SUPPORTED_FAN_MODES = [
     FAN_AUTO,
@@ -0,0 +1,43 @@
+"""Diagnostics support for the WF-RAC integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import HomeAssistant
+
+from . import MitsubishiWfRacConfigEntry
+from .const import CONF_OPERATOR_ID, DATA_STALL_DETECTOR
+
+TO_REDACT = {CONF_OPERATOR_ID, CONF_DEVICE_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: MitsubishiWfRacConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    device = entry.runtime_data.device
+    history = device.history
+    detector = hass.data.get(DATA_STALL_DETECTOR)
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "device": {
+            "available": device.available,
+            "num_accounts": device.num_accounts,
+            "rejected_frames": device.rejected_frames,
+            "airco": vars(device.airco),
+        },
+        "history": {
+            "capacity": history.capacity,
+            "bytes": history.nbytes,
+            "samples": history.samples(),
+        },
+        # shared by all airco's, the sections are the same code for each
+        "stall_detection": detector.as_dict() if detector is not None else None,
+    }
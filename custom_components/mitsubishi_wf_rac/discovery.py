@@ -0,0 +1,129 @@
+"""Cache of WF-RAC modules discovered with zeroconf."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_DISCOVERY_CACHE
+from .wfrac.repository import Repository
+
+_LOGGER = logging.getLogger(__name__)
+
+# TXT record keys that may carry the airco ID of the module
+TXT_AIRCO_ID_KEYS = ("airconId", "airconid", "aircon_id")
+
+
+@dataclass
+class DiscoveredAirco:
+    """A WF-RAC module announced over mDNS"""
+
+    name: str
+    host: str
+    port: int
+    airco_id: str | None = None
+    service_name: str | None = None
+
+
+def airco_id_from_properties(properties: dict[str, Any]) -> str | None:
+    """Return the airco ID from zeroconf TXT properties, if it is announced"""
+    for key in TXT_AIRCO_ID_KEYS:
+        value = properties.get(key)
+        if value:
+            return str(value)
+    return None
+
+
+class DiscoveryCache:
+    """Discovery info keyed by mDNS name, shared by all config flows"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._discovered: dict[str, DiscoveredAirco] = {}
+        self._lookups: dict[tuple[str, int], asyncio.Task[str]] = {}
+
+    @callback
+    def async_record(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        host: str,
+        port: int,
+        airco_id: str | None = None,
+        service_name: str | None = None,
+    ) -> DiscoveredAirco:
+        """Record (or refresh) a discovered module"""
+        previous = self._discovered.get(name)
+        if previous is not None:
+            # the mDNS name belongs to the module, so the ID survives a new address
+            airco_id = airco_id or previous.airco_id
+            service_name = service_name or previous.service_name
+        discovered = DiscoveredAirco(name, host, port, airco_id, service_name)
+        self._discovered[name] = discovered
+        # DHCP gave the address of another module to this one, forget that one
+        for other in [
+            other
+            for other in self._discovered.values()
+            if other is not discovered and (other.host, other.port) == (host, port)
+        ]:
+            del self._discovered[other.name]
+        return discovered
+
+    @callback
+    def async_get(self, name: str) -> DiscoveredAirco | None:
+        """Return the discovery info for an mDNS name"""
+        return self._discovered.get(name)
+
+    @callback
+    def async_find(self, host: str, port: int) -> DiscoveredAirco | None:
+        """Return the discovery info for a host and port"""
+        for discovered in self._discovered.values():
+            if discovered.host == host and discovered.port == port:
+                return discovered
+        return None
+
+    @callback
+    def async_find_airco_id(self, airco_id: str) -> DiscoveredAirco | None:
+        """Return the discovery info for an airco ID"""
+        for discovered in self._discovered.values():
+            if discovered.airco_id == airco_id:
+                return discovered
+        return None
+
+    async def async_get_airco_id(
+        self, repository: Repository, host: str, port: int
+    ) -> str:
+        """Return the airco ID of a module, only asking the module when it isn't known yet.
+
+        Concurrent lookups for the same module share a single request.
+        """
+        discovered = self.async_find(host, port)
+        if discovered is not None and discovered.airco_id:
+            return discovered.airco_id
+
+        key = (host, port)
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            lookup = self._hass.async_create_task(
+                repository.get_airco_id(), f"wf-rac airco id lookup {host}"
+            )
+            self._lookups[key] = lookup
+            lookup.add_done_callback(lambda _: self._lookups.pop(key, None))
+
+        airco_id = await asyncio.shield(lookup)
+
+        discovered = self.async_find(host, port)
+        if discovered is not None:
+            discovered.airco_id = airco_id
+        return airco_id
+
+
+@callback
+def async_get_discovery_cache(hass: HomeAssistant) -> DiscoveryCache:
+    """Return the discovery cache, creating it when needed"""
+    if DATA_DISCOVERY_CACHE not in hass.data:
+        hass.data[DATA_DISCOVERY_CACHE] = DiscoveryCache(hass)
+    return hass.data[DATA_DISCOVERY_CACHE]
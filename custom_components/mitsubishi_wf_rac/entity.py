@@ -0,0 +1,41 @@
+"""Base for the entities that show fields of the airco."""
+
+from __future__ import annotations
+
+import abc
+from collections.abc import Iterable
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+from .wfrac.device import Device
+
+
+class AircoEntity(Entity):
+    """Mixin for entities that are updated when the airco fields they show change.
+
+    Set _device and _fields, the entity is updated whenever one of the fields
+    changes. Without fields it is updated on every change.
+    """
+
+    _attr_should_poll = False
+    _device: Device
+    _fields: Iterable[str] | None
+
+    async def async_added_to_hass(self) -> None:
+        """Register for airco updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._device.add_listener(self._handle_device_update, self._fields)
+        )
+
+    @callback
+    def _handle_device_update(self, _changes: dict[str, Any]) -> None:
+        """Update the state when one of the fields of the airco changed."""
+        self._update_state()
+        self.async_write_ha_state()
+
+    @abc.abstractmethod
+    def _update_state(self) -> None:
+        """Update the attributes from the airco"""
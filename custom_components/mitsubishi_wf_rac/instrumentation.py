@@ -0,0 +1,83 @@
+"""Temporarily wrap the functions of the integration that do the work."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import functools
+import inspect
+from typing import Any
+
+from .wfrac.device import Device
+from .wfrac.rac_parser import RacParser
+from .wfrac.repository import Repository
+
+type Wrapper = Callable[[Callable[..., Any], str], Callable[..., Any]]
+
+
+def hot_paths() -> list[tuple[type, str]]:
+    """The functions worth measuring, as the class and the name they are on"""
+    # the platforms are loaded by now, when any airco is set up
+    # pylint: disable=import-outside-toplevel
+    from . import climate, select, sensor
+
+    targets: list[tuple[type, str]] = [
+        (Repository, "_post"),
+        (Device, "update"),
+        (RacParser, "translate_bytes"),
+        (RacParser, "to_base64"),
+        (climate.AircoClimate, "determine_preset_mode"),
+    ]
+    for module in (climate, select, sensor):
+        targets.extend(
+            (value, "_update_state")
+            for value in vars(module).values()
+            if isinstance(value, type)
+            and value.__module__ == module.__name__
+            and "_update_state" in vars(value)
+        )
+    return targets
+
+
+def loop_sections() -> list[tuple[type, str]]:
+    """The synchronous hot paths, which hold up the event loop while they run"""
+    return [
+        (owner, name)
+        for owner, name in hot_paths()
+        if not inspect.iscoroutinefunction(vars(owner)[name])
+    ] + [(Device, "_dispatch_changes")]
+
+
+def function_name(owner: type, name: str) -> str:
+    """Short name of the function on owner, like sensor.PowerSensor._update_state"""
+    return f"{owner.__module__.rpartition('.')[2]}.{owner.__name__}.{name}"
+
+
+class Patches:
+    """Functions replaced by a wrapper, until they are restored.
+
+    Nothing is left behind once restored, so the integration runs exactly as
+    it does without instrumentation.
+    """
+
+    def __init__(self) -> None:
+        self._originals: list[tuple[type, str, Any]] = []
+
+    def wrap(self, targets: list[tuple[type, str]], wrapper: Wrapper) -> None:
+        """Replace every target by wrapper(function, name)"""
+        for owner, name in targets:
+            original = vars(owner)[name]
+            self._originals.append((owner, name, original))
+            setattr(
+                owner,
+                name,
+                functools.wraps(original)(wrapper(original, function_name(owner, name))),
+            )
+
+    def restore(self) -> None:
+        """Put the original functions back"""
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def __bool__(self) -> bool:
+        return bool(self._originals)
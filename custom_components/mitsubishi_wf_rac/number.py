@@ -33,6 +33,8 @@ async def async_setup_entry(hass, entry: MitsubishiWfRacConfigEntry, async_add_e
 class PresetModeNumber(RestoreNumber, NumberEntity):
     """Preset mode number"""
 
+    _attr_should_poll = False
+
     def __init__(self, i, data: MitsubishiWfRacData, hass):
         self._hass = hass
         super().__init__()
@@ -50,6 +52,7 @@ class PresetModeNumber(RestoreNumber, NumberEntity):
         state = await self.async_get_last_number_data()
         if state and state.native_value:
             self._data.preset_modes[self.i].temperature = state.native_value
+            self._data.update_presets()
 
     @property
     def native_min_value(self) -> float:
@@ -71,4 +74,5 @@ class PresetModeNumber(RestoreNumber, NumberEntity):
     async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
         self._data.preset_modes[self.i].temperature = value
+        self._data.update_presets()
         self.async_write_ha_state()
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Profile the hot paths of the integration for a while, on request."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import cProfile
+import inspect
+from pathlib import Path
+import pstats
+import time
+from typing import Any
+
+from .instrumentation import Patches, hot_paths
+
+
+class ProfilerBusyError(Exception):
+    """Raised when another profiler is already active"""
+
+
+class IntegrationProfiler:
+    """Profiles the hot paths of the integration while started.
+
+    Synchronous functions run under cProfile, which shows what they spend
+    their time on. Coroutines give up the loop while they wait, profiling
+    them would mostly measure everything else on the loop, so they only get
+    their calls and wall time counted. Only the wrapped functions are
+    profiled, the rest of Home Assistant is not.
+    """
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+        self._patches = Patches()
+        self._depth = 0
+        # calls, total seconds and longest call of every coroutine
+        self._coroutines: dict[str, list[float]] = {}
+        self._started = 0.0
+        self._stopped = 0.0
+
+    def start(self) -> None:
+        """Wrap the hot paths, raises ProfilerBusyError when cProfile is in use"""
+        try:
+            self._profile.enable()
+        except ValueError as error:
+            raise ProfilerBusyError(str(error)) from error
+        self._profile.disable()
+
+        self._patches.wrap(hot_paths(), self._wrap)
+        self._started = time.monotonic()
+
+    def stop(self) -> None:
+        """Put the original functions back"""
+        if self._patches:
+            self._patches.restore()
+            self._stopped = time.monotonic()
+
+    @property
+    def active(self) -> bool:
+        """Return True while the hot paths are wrapped"""
+        return bool(self._patches)
+
+    def dump(self, path: str | Path) -> None:
+        """Write the cProfile stats, for snakeviz or pstats. Does I/O."""
+        self._profile.dump_stats(path)
+
+    def report(self, top: int) -> dict[str, Any]:
+        """The top functions by cumulative time and the coroutine wall times"""
+        stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+        functions = sorted(
+            # leave out switching the profiler off, which it sees as well
+            (item for item in stats.items() if "_lsprof" not in item[0][2]),
+            key=lambda item: item[1][3],
+            reverse=True,
+        )[:top]
+        coroutines = sorted(
+            self._coroutines.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return {
+            "duration": round(self._stopped - self._started, 1),
+            "functions": [
+                {
+                    "function": f"{Path(file).name}:{line}({name})",
+                    "calls": calls,
+                    "own_ms": round(own * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3),
+                }
+                for (file, line, name), (_, calls, own, cumulative, _) in functions
+            ],
+            "coroutines": [
+                {
+                    "function": name,
+                    "calls": int(calls),
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total / calls * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for name, (calls, total, longest) in coroutines[:top]
+            ],
+        }
+
+    def _wrap(self, func: Callable[..., Any], name: str) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            async def _timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._count(name, time.perf_counter() - start)
+
+            return _timed
+
+        def _profiled(*args, **kwargs):
+            if self._depth:
+                # called from another profiled function, already profiling
+                return func(*args, **kwargs)
+            self._depth += 1
+            self._profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._profile.disable()
+                self._depth -= 1
+
+        return _profiled
+
+    def _count(self, name: str, seconds: float) -> None:
+        counts = self._coroutines.setdefault(name, [0, 0.0, 0.0])
+        counts[0] += 1
+        counts[1] += seconds
+        counts[2] = max(counts[2], seconds)
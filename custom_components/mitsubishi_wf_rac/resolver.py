@@ -0,0 +1,211 @@
+"""Keep the host of configured airco's up to date when their IP changes."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from ipaddress import ip_address
+import logging
+from typing import Any
+
+from homeassistant.components import zeroconf
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant, callback
+from zeroconf import IPVersion, ServiceStateChange
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+
+from .adapter import async_create_repository
+from .const import CONF_AIRCO_ID, CONF_SERVICE_NAME, DATA_HOST_RESOLVER, ZEROCONF_TYPE
+from .discovery import airco_id_from_properties, async_get_discovery_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+# how long to wait for a module to answer an mDNS query
+_MDNS_REQUEST_TIMEOUT_MS = 3000
+# how long to browse for modules when the service name of an airco is unknown
+_MDNS_BROWSE_SECONDS = 5
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class HostResolver:
+    """Update the host of live devices from zeroconf announcements"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._entries: dict[str, ConfigEntry] = {}
+        self._rediscovering: set[str] = set()
+
+    @callback
+    def async_register(self, entry: ConfigEntry) -> Callable[[], None]:
+        """Start resolving the host of an entry, returns an unregister function"""
+        airco_id: str = entry.data[CONF_AIRCO_ID]
+        self._entries[airco_id] = entry
+
+        @callback
+        def _unreachable() -> None:
+            self._hass.async_create_background_task(
+                self.async_rediscover(airco_id), f"wf-rac rediscover {airco_id}"
+            )
+
+        remove_listener = entry.runtime_data.device.add_unreachable_listener(
+            _unreachable
+        )
+
+        @callback
+        def _unregister() -> None:
+            remove_listener()
+            if self._entries.get(airco_id) is entry:
+                del self._entries[airco_id]
+
+        return _unregister
+
+    @callback
+    def async_host_discovered(
+        self, airco_id: str, host: str, service_name: str | None = None
+    ) -> bool:
+        """Handle a module announcing itself, returns True if the host was updated"""
+        entry = self._entries.get(airco_id)
+        if entry is None:
+            return False
+        if service_name is not None:
+            self._async_remember_service_name(entry, service_name)
+
+        current_host = entry.options.get(CONF_HOST)
+        if current_host == host:
+            return False
+        if current_host is not None and not _is_ip_address(current_host):
+            # a hostname the user entered follows the airco by itself
+            return False
+
+        device = entry.runtime_data.device
+        _LOGGER.info(
+            "Airco [%s] moved from %s to %s",
+            device.name,
+            current_host,
+            host,
+        )
+        device.set_host(host)
+        # there is no update listener, so this won't reload the entry
+        self._hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_HOST: host}
+        )
+        # don't wait for the next poll to find out the airco is back
+        self._hass.async_create_background_task(
+            device.update(no_throttle=True), f"wf-rac update {airco_id}"
+        )
+        return True
+
+    @callback
+    def _async_remember_service_name(
+        self, entry: ConfigEntry, service_name: str
+    ) -> None:
+        """Keep the service name in the entry, unlike the discovery cache it lasts"""
+        if entry.data.get(CONF_SERVICE_NAME) != service_name:
+            self._hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_SERVICE_NAME: service_name}
+            )
+
+    async def async_rediscover(self, airco_id: str) -> None:
+        """Ask the airco's mDNS service for its current address"""
+        entry = self._entries.get(airco_id)
+        if entry is None or airco_id in self._rediscovering:
+            return
+        if not _is_ip_address(entry.options[CONF_HOST]):
+            _LOGGER.debug("Airco [%s] has a hostname, not rediscovering", airco_id)
+            return
+
+        discovered = async_get_discovery_cache(self._hass).async_find_airco_id(
+            airco_id
+        )
+        service_name: str | None = entry.data.get(CONF_SERVICE_NAME)
+        if service_name is None and discovered is not None:
+            service_name = discovered.service_name
+
+        self._rediscovering.add(airco_id)
+        try:
+            aiozc = await zeroconf.async_get_async_instance(self._hass)
+            if service_name is None:
+                service_name = await self._async_browse(aiozc, entry)
+                if service_name is None:
+                    _LOGGER.debug("Airco [%s] wasn't found on mDNS", airco_id)
+                    return
+            info = AsyncServiceInfo(ZEROCONF_TYPE, service_name)
+            if not await info.async_request(aiozc.zeroconf, _MDNS_REQUEST_TIMEOUT_MS):
+                _LOGGER.debug("Airco [%s] didn't answer the mDNS query", airco_id)
+                return
+            addresses = info.parsed_addresses(IPVersion.V4Only)
+        finally:
+            self._rediscovering.discard(airco_id)
+
+        if addresses:
+            if discovered is not None:
+                async_get_discovery_cache(self._hass).async_record(
+                    discovered.name,
+                    addresses[0],
+                    info.port or discovered.port,
+                    airco_id,
+                )
+            self.async_host_discovered(airco_id, addresses[0])
+
+    async def _async_browse(
+        self, aiozc: AsyncZeroconf, entry: ConfigEntry
+    ) -> str | None:
+        """Find the service name of an airco among the announced modules"""
+        names: set[str] = set()
+
+        def _service_changed(**change: Any) -> None:
+            if change["state_change"] is not ServiceStateChange.Removed:
+                names.add(change["name"])
+
+        browser = AsyncServiceBrowser(
+            aiozc.zeroconf, ZEROCONF_TYPE, handlers=[_service_changed]
+        )
+        try:
+            await asyncio.sleep(_MDNS_BROWSE_SECONDS)
+        finally:
+            await browser.async_cancel()
+
+        airco_id: str = entry.data[CONF_AIRCO_ID]
+        device = entry.runtime_data.device
+        for name in names:
+            info = AsyncServiceInfo(ZEROCONF_TYPE, name)
+            if not await info.async_request(aiozc.zeroconf, _MDNS_REQUEST_TIMEOUT_MS):
+                continue
+            found = airco_id_from_properties(info.decoded_properties)
+            addresses = info.parsed_addresses(IPVersion.V4Only)
+            if found is None and addresses and info.port:
+                # not announced, ask the module itself
+                repository = async_create_repository(
+                    self._hass,
+                    addresses[0],
+                    info.port,
+                    device.operator_id,
+                    device.device_id,
+                )
+                try:
+                    found = await async_get_discovery_cache(
+                        self._hass
+                    ).async_get_airco_id(repository, addresses[0], info.port)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.debug("Could not ask %s for its airco ID", name)
+                    continue
+            if found == airco_id:
+                self._async_remember_service_name(entry, name)
+                return name
+        return None
+
+
+@callback
+def async_get_host_resolver(hass: HomeAssistant) -> HostResolver:
+    """Return the host resolver, creating it when needed"""
+    if DATA_HOST_RESOLVER not in hass.data:
+        hass.data[DATA_HOST_RESOLVER] = HostResolver(hass)
+    return hass.data[DATA_HOST_RESOLVER]
@@ -0,0 +1,85 @@
+"""Scan a network range for WF-RAC modules that mDNS can't reach."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from ipaddress import IPv4Network
+import logging
+
+from homeassistant.core import HomeAssistant
+
+from .adapter import async_create_repository
+
+_LOGGER = logging.getLogger(__name__)
+
+# a module on the local network accepts a connection well within this time
+_PROBE_TIMEOUT = timedelta(seconds=1)
+# number of hosts probed at the same time
+SCAN_CONCURRENCY = 128
+# don't let a typo turn into a scan of a whole /8
+MAX_SCAN_HOSTS = 1024
+
+
+@dataclass
+class ScannedAirco:
+    """A WF-RAC module found by scanning"""
+
+    host: str
+    port: int
+    airco_id: str
+
+
+async def _async_port_open(host: str, port: int) -> bool:
+    """Return True if a TCP connection can be made to host:port"""
+    try:
+        async with asyncio.timeout(_PROBE_TIMEOUT.total_seconds()):
+            _, writer = await asyncio.open_connection(host, port)
+    except (OSError, TimeoutError):
+        return False
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def async_scan_network(  # pylint: disable=too-many-arguments
+    hass: HomeAssistant,
+    network: IPv4Network,
+    port: int,
+    operator_id: str,
+    device_id: str,
+    concurrency: int = SCAN_CONCURRENCY,
+) -> list[ScannedAirco]:
+    """Find all WF-RAC modules listening on port in network"""
+    if network.num_addresses > MAX_SCAN_HOSTS:
+        raise ValueError(f"{network} has more than {MAX_SCAN_HOSTS} addresses")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _async_probe(host: str) -> ScannedAirco | None:
+        async with semaphore:
+            if not await _async_port_open(host, port):
+                return None
+
+        # only the hosts with an open port get a (much slower) API request
+        repository = async_create_repository(
+            hass, host, port, operator_id, device_id
+        )
+        try:
+            airco_id = await repository.get_airco_id()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("%s:%s is open, but isn't a WF-RAC module", host, port)
+            return None
+        return ScannedAirco(host, port, airco_id)
+
+    results = await asyncio.gather(
+        *(_async_probe(str(host)) for host in network.hosts())
+    )
+    found = [result for result in results if result is not None]
+    _LOGGER.debug("Found %d WF-RAC module(s) in %s", len(found), network)
+    return found
@@ -7,10 +7,13 @@ from . import MitsubishiWfRacConfigEntry, MitsubishiWfRacData
 from homeassistant.components.select import SelectEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 
+from .adapter import device_info
+from .entity import AircoEntity
 from .wfrac.models.aircon import AirconCommands
-from .wfrac.device import Device
+from .wfrac.device import Device, FIELD_AVAILABLE
 from .const import (
     DOMAIN,
+    HORIZONTAL_SWING_MODE_BY_VALUE,
     HORIZONTAL_SWING_MODE_TRANSLATION,
     NUMBER_OF_PRESET_MODES,
     SUPPORT_HORIZONTAL_SWING_MODES,
@@ -19,6 +22,7 @@ from .const import (
     SUPPORTED_HVAC_MODES,
     SWING_3D_AUTO,
     SWING_HORIZONTAL_AUTO,
+    SWING_MODE_BY_VALUE,
     SWING_MODE_TRANSLATION,
 )
 
@@ -52,24 +56,30 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class HorizontalSwingSelect(SelectEntity):
+class SwingSelect(AircoEntity, SelectEntity):
+    """Swing select that is updated when the airco fields it shows change"""
+
+    _fields: set[str]
+
+
+class HorizontalSwingSelect(SwingSelect):
     """Select component to set the horizontal swing direction of the airco"""
 
+    _fields = {AirconCommands.WindDirectionLR, FIELD_AVAILABLE}
+
     def __init__(self, device: Device) -> None:
         super().__init__()
         self._attr_options = SUPPORT_HORIZONTAL_SWING_MODES
         self._device = device
         self._attr_name = f"{device.name} horizontal swing direction"
-        self._attr_device_info = device.device_info
+        self._attr_device_info = device_info(device)
         self._attr_icon = "mdi:weather-dust"
         self._attr_unique_id = (
             f"{DOMAIN}-{self._device.airco_id}-horizontal-swing-direction"
         )
         if hasattr(self._device.airco, "WindDirectionLR"):
             self.select_option(
-                list(HORIZONTAL_SWING_MODE_TRANSLATION.keys())[
-                    self._device.airco.WindDirectionLR
-                ]
+                HORIZONTAL_SWING_MODE_BY_VALUE[self._device.airco.WindDirectionLR]
             )
             self._attr_available = self._device.available
         else:
@@ -79,9 +89,7 @@ class HorizontalSwingSelect(SelectEntity):
     def _update_state(self) -> None:
         if hasattr(self._device.airco, "WindDirectionLR"):
             self.select_option(
-                list(HORIZONTAL_SWING_MODE_TRANSLATION.keys())[
-                    self._device.airco.WindDirectionLR
-                ]
+                HORIZONTAL_SWING_MODE_BY_VALUE[self._device.airco.WindDirectionLR]
             )
             self._attr_available = self._device.available
         else:
@@ -99,27 +107,25 @@ class HorizontalSwingSelect(SelectEntity):
         )
         self.select_option(option)
 
-    async def async_update(self):
-        """Retrieve latest state."""
-        self._update_state()
 
-
-class VerticalSwingSelect(SelectEntity):
+class VerticalSwingSelect(SwingSelect):
     """Select component to set the vertical swing direction of the airco"""
 
+    _fields = {AirconCommands.WindDirectionUD, AirconCommands.Entrust, FIELD_AVAILABLE}
+
     def __init__(self, device: Device) -> None:
         super().__init__()
         self._attr_options = SUPPORT_SWING_MODES
         self._device = device
         self._attr_name = f"{device.name} vertical swing direction"
-        self._attr_device_info = device.device_info
+        self._attr_device_info = device_info(device)
         self._attr_icon = "mdi:weather-dust"
         self._attr_unique_id = (
             f"{DOMAIN}-{self._device.airco_id}-vertical-swing-direction"
         )
         if hasattr(self._device.airco, "WindDirectionUD"):
             self.select_option(
-                list(SWING_MODE_TRANSLATION.keys())[self._device.airco.WindDirectionUD]
+                SWING_MODE_BY_VALUE[self._device.airco.WindDirectionUD]
             )
             self._attr_available = self._device.available
         else:
@@ -131,9 +137,7 @@ class VerticalSwingSelect(SelectEntity):
             self.select_option(
                 SWING_3D_AUTO
                 if self._device.airco.Entrust
-                else list(SWING_MODE_TRANSLATION.keys())[
-                    self._device.airco.WindDirectionUD
-                ]
+                else SWING_MODE_BY_VALUE[self._device.airco.WindDirectionUD]
             )
             self._attr_available = self._device.available
         else:
@@ -167,14 +171,12 @@ class VerticalSwingSelect(SelectEntity):
         )
         self.select_option(option)
 
-    async def async_update(self):
-        """Retrieve latest state."""
-        self._update_state()
-
 
 class PresetModeSelect(SelectEntity, RestoreEntity):
     """Preset mode selects for swing and fan speed"""
 
+    _attr_should_poll = False
+
     def __init__(self, i, mode, data: MitsubishiWfRacData, hass):
         self._hass = hass
         super().__init__()
@@ -199,6 +201,7 @@ class PresetModeSelect(SelectEntity, RestoreEntity):
         state = await self.async_get_last_state()
         if state and state.state in self._options:
             setattr(self._data.preset_modes[self.i], self.mode, state.state)
+            self._data.update_presets()
 
     @property
     def options(self) -> list[str]:
@@ -213,4 +216,5 @@ class PresetModeSelect(SelectEntity, RestoreEntity):
     async def async_select_option(self, option: str) -> None:
         """Select new (option)."""
         setattr(self._data.preset_modes[self.i], self.mode, option)
+        self._data.update_presets()
         self.async_write_ha_state()
\ No newline at end of file
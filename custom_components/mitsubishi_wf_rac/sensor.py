@@ -2,22 +2,28 @@
 # pylint: disable = too-few-public-methods
 
 from __future__ import annotations
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
+import time
 
 from . import MitsubishiWfRacConfigEntry
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     UnitOfEnergy,
+    UnitOfPower,
     UnitOfTemperature,
     EntityCategory,
     CONF_HOST,
     CONF_ERROR,
 )
-from homeassistant.util import Throttle
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
 
-from .wfrac.device import Device
+from .adapter import device_info
+from .entity import AircoEntity
+from .wfrac.device import Device, FIELD_AVAILABLE, FIELD_HOST, FIELD_NUM_ACCOUNTS
+from .wfrac.energy import PowerEstimator
 from .const import (
     ATTR_TARGET_TEMPERATURE,
     DOMAIN,
@@ -31,7 +37,18 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
-MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=30)
+# the energy counter may not change for a long time, lower the power meanwhile
+POWER_REFRESH_INTERVAL = timedelta(minutes=1)
+
+# the airco fields each sensor type shows, next to the availability
+SENSOR_FIELDS = {
+    ATTR_INSIDE_TEMPERATURE: "IndoorTemp",
+    ATTR_OUTSIDE_TEMPERATURE: "OutdoorTemp",
+    ATTR_TARGET_TEMPERATURE: "PresetTemp",
+    CONF_HOST: FIELD_HOST,
+    ATTR_CONNECTED_ACCOUNTS: FIELD_NUM_ACCOUNTS,
+    CONF_ERROR: "ErrorCode",
+}
 
 
 async def async_setup_entry(hass, entry: MitsubishiWfRacConfigEntry, async_add_entities):
@@ -53,11 +70,23 @@ async def async_setup_entry(hass, entry: MitsubishiWfRacConfigEntry, async_add_e
     ]
     if hasattr(device.airco, 'Electric') and device.airco.Electric is not None:
         entities.append(EnergySensor(device))
+        entities.append(PowerSensor(device))
+    # readings of newer units the integration does not know yet
+    entities.extend(
+        RecordSensor(device, tag)
+        for tag in getattr(device.airco, "UnknownRecords", {})
+    )
 
     async_add_entities(entities)
 
 
-class DiagnosticsSensor(SensorEntity):
+class AircoSensorEntity(AircoEntity, SensorEntity):
+    """Sensor that is updated when the airco fields it shows change."""
+
+    _fields: set[str]
+
+
+class DiagnosticsSensor(AircoSensorEntity):
     # pylint: disable = too-many-instance-attributes
     """Representation of a Sensor."""
 
@@ -71,7 +100,10 @@ class DiagnosticsSensor(SensorEntity):
         self._attr_name = f"{device.name} {name}"
         self._attr_entity_registry_enabled_default = enable
         self._custom_type = custom_type
-        self._attr_device_info = device.device_info
+        self._fields = {FIELD_AVAILABLE}
+        if custom_type in SENSOR_FIELDS:
+            self._fields.add(SENSOR_FIELDS[custom_type])
+        self._attr_device_info = device_info(device)
         self._attr_native_unit_of_measurement = (
             "Accounts" if custom_type == ATTR_CONNECTED_ACCOUNTS else None
         )
@@ -98,12 +130,8 @@ class DiagnosticsSensor(SensorEntity):
             self._attr_native_value = self._device.airco.ErrorCode if hasattr(self._device.airco, "ErrorCode") else None
         self._attr_available = self._device.available
 
-    async def async_update(self):
-        """Retrieve latest state."""
-        self._update_state()
-
 
-class TemperatureSensor(SensorEntity):
+class TemperatureSensor(AircoSensorEntity):
     """Representation of a Sensor."""
 
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
@@ -114,9 +142,10 @@ class TemperatureSensor(SensorEntity):
         """Initialize the sensor."""
         self._device = device
         self._custom_type = custom_type
+        self._fields = {FIELD_AVAILABLE, SENSOR_FIELDS[custom_type]}
         self._attr_entity_registry_enabled_default = enable
         self._attr_name = f"{device.name} {name}"
-        self._attr_device_info = device.device_info
+        self._attr_device_info = device_info(device)
         self._attr_unique_id = (
             f"{DOMAIN}-{self._device.airco_id}-{self._custom_type}-sensor"
         )
@@ -137,13 +166,8 @@ class TemperatureSensor(SensorEntity):
             self._attr_available = hasattr(self._device.airco, "PresetTemp")
         self._attr_available = self._device.available
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def async_update(self):
-        """Retrieve latest state."""
-        self._update_state()
-
 
-class EnergySensor(SensorEntity):
+class EnergySensor(AircoSensorEntity):
     """Representation of a Sensor."""
 
     _attr_native_unit_of_measurement: str | None = UnitOfEnergy.KILO_WATT_HOUR
@@ -154,14 +178,83 @@ class EnergySensor(SensorEntity):
         """Initialize the sensor."""
         self._device = device
         self._attr_name = f"{device.name} energy usage cycle"
-        self._attr_device_info = device.device_info
+        self._attr_device_info = device_info(device)
         self._attr_unique_id = f"{DOMAIN}-{self._device.airco_id}-energy-sensor"
+        self._fields = {FIELD_AVAILABLE, "Electric"}
         self._update_state()
 
     def _update_state(self) -> None:
         self._attr_native_value = self._device.airco.Electric
         self._attr_available = self._device.available
 
-    async def async_update(self):
-        """Retrieve latest state."""
+
+class PowerSensor(AircoSensorEntity):
+    """Power usage, estimated from the steps of the energy counter."""
+
+    _attr_native_unit_of_measurement: str | None = UnitOfPower.WATT
+    _attr_device_class: SensorDeviceClass | str | None = SensorDeviceClass.POWER
+    _attr_state_class: SensorStateClass | str | None = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, device: Device) -> None:
+        """Initialize the sensor."""
+        self._device = device
+        self._estimator = PowerEstimator()
+        self._attr_name = f"{device.name} power"
+        self._attr_device_info = device_info(device)
+        self._attr_unique_id = f"{DOMAIN}-{self._device.airco_id}-power-sensor"
+        self._fields = {FIELD_AVAILABLE, "Electric", "Operation"}
         self._update_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Register for airco updates and lower the power while the counter is flat."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_refresh, POWER_REFRESH_INTERVAL
+            )
+        )
+
+    @callback
+    def _async_refresh(self, _now: datetime) -> None:
+        if getattr(self._device.airco, "Operation", None) is False:
+            return
+        power = self._estimator.power(time.monotonic())
+        if power != self._attr_native_value:
+            self._attr_native_value = power
+            self.async_write_ha_state()
+
+    def _update_state(self) -> None:
+        airco = self._device.airco
+        if getattr(airco, "Operation", None) is False:
+            # the counter stops, the steps from before would span the off time
+            self._estimator.reset()
+            self._attr_native_value = 0
+        else:
+            now = time.monotonic()
+            self._estimator.add(now, getattr(airco, "Electric", None))
+            self._attr_native_value = self._estimator.power(now)
+        self._attr_available = self._device.available
+
+
+class RecordSensor(AircoSensorEntity):
+    """Raw value of a sensor record the integration does not know."""
+
+    _attr_entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, device: Device, tag: str) -> None:
+        """Initialize the sensor."""
+        self._device = device
+        self._tag = tag
+        self._attr_name = f"{device.name} record {tag}"
+        self._attr_device_info = device_info(device)
+        self._attr_unique_id = f"{DOMAIN}-{self._device.airco_id}-record-{tag}-sensor"
+        self._fields = {FIELD_AVAILABLE, "UnknownRecords"}
+        self._update_state()
+
+    def _update_state(self) -> None:
+        self._attr_native_value = getattr(
+            self._device.airco, "UnknownRecords", {}
+        ).get(self._tag)
+        self._attr_available = self._device.available
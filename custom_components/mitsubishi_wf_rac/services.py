@@ -0,0 +1,516 @@
+"""Domain services of the WF-RAC integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry, ConfigEntryState
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_HOST,
+    CONF_NAME,
+    CONF_PATH,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.service import async_extract_config_entry_ids
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_ENABLED,
+    ATTR_LIMIT,
+    ATTR_MAX_PARALLEL,
+    ATTR_THRESHOLD,
+    ATTR_TOP,
+    ATTR_UNITS,
+    CONF_AIRCO_ID,
+    CONF_OPERATOR_ID,
+    DATA_PROFILER,
+    DATA_STALL_DETECTOR,
+    DATA_TRAFFIC_RECORDING,
+    DEFAULT_PORT,
+    DOMAIN,
+    SERVICE_DETECT_STALLS,
+    SERVICE_GET_HISTORY,
+    SERVICE_PROFILE,
+    SERVICE_PROVISION,
+    SERVICE_RECORD_TRAFFIC,
+    SERVICE_SEND_COMMAND,
+)
+from .wfrac.models.aircon import AirconCommands
+from .wfrac.repository import Repository
+from .wfrac.transport import TrafficRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLEL = 8
+
+PROVISION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_UNITS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(CONF_HOST): cv.string,
+                        vol.Required(CONF_NAME): cv.string,
+                        vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
+                    }
+                )
+            ],
+        ),
+        vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+    }
+)
+
+# service fields of the send_command service and the airco command they set
+COMMAND_FIELDS = {
+    "operation": AirconCommands.Operation,
+    "operation_mode": AirconCommands.OperationMode,
+    "air_flow": AirconCommands.AirFlow,
+    "wind_direction_ud": AirconCommands.WindDirectionUD,
+    "wind_direction_lr": AirconCommands.WindDirectionLR,
+    "preset_temp": AirconCommands.PresetTemp,
+    "entrust": AirconCommands.Entrust,
+}
+
+SEND_COMMAND_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **cv.TARGET_SERVICE_FIELDS,
+            vol.Optional("operation"): cv.boolean,
+            vol.Optional("operation_mode"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=4)
+            ),
+            vol.Optional("air_flow"): vol.All(vol.Coerce(int), vol.Range(min=0, max=4)),
+            vol.Optional("wind_direction_ud"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=4)
+            ),
+            vol.Optional("wind_direction_lr"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=7)
+            ),
+            vol.Optional("preset_temp"): vol.All(
+                vol.Coerce(float), vol.Range(min=16, max=30)
+            ),
+            vol.Optional("entrust"): cv.boolean,
+            vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=64)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(*COMMAND_FIELDS),
+)
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_DURATION, default={"hours": 1}): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+        vol.Optional(CONF_PATH): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default={"minutes": 1}): vol.All(
+            cv.time_period,
+            cv.positive_timedelta,
+            vol.Range(max=timedelta(minutes=30)),
+        ),
+        vol.Optional(ATTR_TOP, default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+        vol.Optional(CONF_PATH): cv.string,
+    }
+)
+
+DETECT_STALLS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENABLED): cv.boolean,
+        vol.Optional(ATTR_THRESHOLD, default=50): vol.All(
+            vol.Coerce(float), vol.Range(min=1)
+        ),
+    }
+)
+
+DEFAULT_TRAFFIC_FILE = f"{DOMAIN}_traffic.jsonl"
+DEFAULT_PROFILE_FILE = f"{DOMAIN}.prof"
+
+
+def _async_get_target_entries(
+    hass: HomeAssistant, entry_ids: set[str]
+) -> list[ConfigEntry]:
+    """Return the entries of this integration among entry_ids"""
+    return [
+        entry
+        for entry_id in entry_ids
+        if (entry := hass.config_entries.async_get_entry(entry_id)) is not None
+        and entry.domain == DOMAIN
+    ]
+
+
+async def _async_provision(call: ServiceCall) -> ServiceResponse:
+    """Register many airco's at once and create their entries"""
+    # pylint: disable=import-outside-toplevel
+    from .config_flow import (
+        KnownError,
+        async_get_device_id,
+        async_get_operator_id,
+        async_register_airco,
+    )
+
+    hass = call.hass
+    # every airco gets the same operator and device id, like the config flow does
+    operator_id = async_get_operator_id(hass)
+    device_id = async_get_device_id(hass)
+    semaphore = asyncio.Semaphore(call.data[ATTR_MAX_PARALLEL])
+
+    async def _async_provision_unit(unit: dict[str, Any]) -> dict[str, Any]:
+        data = {
+            CONF_NAME: unit[CONF_NAME],
+            CONF_HOST: unit[CONF_HOST],
+            CONF_PORT: unit[CONF_PORT],
+            CONF_OPERATOR_ID: operator_id,
+            CONF_DEVICE_ID: device_id,
+        }
+        result: dict[str, Any] = {
+            CONF_HOST: unit[CONF_HOST],
+            CONF_NAME: unit[CONF_NAME],
+        }
+
+        try:
+            async with semaphore:
+                info = await async_register_airco(hass, data)
+        except KnownError as error:
+            _LOGGER.warning(
+                "Could not provision airco at %s: %r", data[CONF_HOST], error
+            )
+            return result | {"success": False, "error": error.error_name}
+        except Exception as error:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "Unexpected error provisioning airco at %s", data[CONF_HOST]
+            )
+            return result | {"success": False, "error": str(error)}
+
+        flow_result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_IMPORT}, data=info
+        )
+        if flow_result["type"] is not FlowResultType.CREATE_ENTRY:
+            return result | {
+                "success": False,
+                CONF_AIRCO_ID: info[CONF_AIRCO_ID],
+                "error": flow_result.get("reason"),
+            }
+        return result | {"success": True, CONF_AIRCO_ID: info[CONF_AIRCO_ID]}
+
+    results = await asyncio.gather(
+        *(_async_provision_unit(unit) for unit in call.data[ATTR_UNITS])
+    )
+    return {"results": list(results)}
+
+
+async def _async_send_command(call: ServiceCall) -> ServiceResponse:
+    """Send the same command to many airco's in parallel"""
+    hass = call.hass
+    params = {
+        command: call.data[field]
+        for field, command in COMMAND_FIELDS.items()
+        if field in call.data
+    }
+    semaphore = asyncio.Semaphore(call.data[ATTR_MAX_PARALLEL])
+
+    entries = _async_get_target_entries(
+        hass, await async_extract_config_entry_ids(hass, call)
+    )
+
+    async def _async_send_unit(entry: ConfigEntry) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            CONF_AIRCO_ID: entry.data[CONF_AIRCO_ID],
+            CONF_NAME: entry.data[CONF_NAME],
+        }
+        if entry.state is not ConfigEntryState.LOADED:
+            return result | {"success": False, "error": "not_loaded"}
+
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                success = await entry.runtime_data.device.set_airco(params)
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Unexpected error sending command to airco [%s]",
+                    entry.data[CONF_NAME],
+                )
+                return result | {"success": False, "error": str(error)}
+            latency = time.monotonic() - start
+
+        return result | {"success": success, "latency": round(latency, 3)}
+
+    results = await asyncio.gather(*(_async_send_unit(entry) for entry in entries))
+    return {"results": list(results)}
+
+
+async def _async_get_history(call: ServiceCall) -> ServiceResponse:
+    """Return the recent airco values kept in memory"""
+    hass = call.hass
+    entries = _async_get_target_entries(
+        hass, await async_extract_config_entry_ids(hass, call)
+    )
+
+    return {
+        "history": [
+            {
+                CONF_AIRCO_ID: entry.data[CONF_AIRCO_ID],
+                CONF_NAME: entry.data[CONF_NAME],
+                "samples": entry.runtime_data.device.history.samples(
+                    call.data.get(ATTR_LIMIT)
+                ),
+            }
+            for entry in entries
+            if entry.state is ConfigEntryState.LOADED
+        ]
+    }
+
+
+class _TrafficRecording:
+    """Records the exchanges of some airco's to a file, until it is stopped"""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        recorder: TrafficRecorder,
+        repositories: list[Repository],
+        duration: float,
+    ) -> None:
+        self._hass = hass
+        self._recorder = recorder
+        self._repositories = repositories
+        for repository in repositories:
+            repository.start_recording(recorder)
+        self._cancel_timer = async_call_later(hass, duration, self.async_stop)
+        self._cancel_stop_listener: CALLBACK_TYPE | None = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_hass_stop
+        )
+
+    @callback
+    def async_stop(self, *_args) -> None:
+        """Stop recording and write everything that is still buffered"""
+        if self._hass.data.get(DATA_TRAFFIC_RECORDING) is self:
+            self._hass.data.pop(DATA_TRAFFIC_RECORDING)
+        self._cancel_timer()
+        if self._cancel_stop_listener is not None:
+            self._cancel_stop_listener()
+            self._cancel_stop_listener = None
+        for repository in self._repositories:
+            repository.stop_recording()
+        self._repositories.clear()
+        self._hass.async_create_task(self._recorder.async_close())
+        _LOGGER.info("Stopped recording airco traffic to %s", self._recorder.path)
+
+    @callback
+    def async_remove(self, repository: Repository) -> None:
+        """Stop recording one airco, the recording stops with the last one"""
+        if repository not in self._repositories:
+            return
+        repository.stop_recording()
+        self._repositories.remove(repository)
+        if self._repositories:
+            self._hass.async_create_task(self._recorder.async_flush())
+        else:
+            self.async_stop()
+
+    @callback
+    def _async_hass_stop(self, _event: Event) -> None:
+        # the listener is gone once it fired
+        self._cancel_stop_listener = None
+        self.async_stop()
+
+
+@callback
+def async_stop_recording(hass: HomeAssistant, repository: Repository) -> None:
+    """Stop recording the traffic of an airco, when its entry is unloaded"""
+    recording: _TrafficRecording | None = hass.data.get(DATA_TRAFFIC_RECORDING)
+    if recording is not None:
+        recording.async_remove(repository)
+
+
+@callback
+def async_stop_instrumentation(hass: HomeAssistant, *_args) -> None:
+    """Put the functions wrapped by the profiler or the stall detection back"""
+    if (profiler := hass.data.get(DATA_PROFILER)) is not None:
+        # the profile service still writes what was profiled so far
+        profiler.stop()
+    if (detector := hass.data.get(DATA_STALL_DETECTOR)) is not None and detector.active:
+        detector.stop()
+        _LOGGER.info("Stopped detecting stalls of the event loop")
+
+
+@callback
+def _async_output_path(hass: HomeAssistant, call: ServiceCall, default: str) -> str:
+    """The file a service writes to, only a path given by the user is checked"""
+    if not (path := call.data.get(CONF_PATH)):
+        return hass.config.path(default)
+    if not hass.config.is_allowed_path(path):
+        raise ServiceValidationError(f"Not allowed to write to {path}")
+    return path
+
+
+async def _async_record_traffic(call: ServiceCall) -> ServiceResponse:
+    """Record the exchanges with the airco's to a file, for replaying later"""
+    hass = call.hass
+    path = _async_output_path(hass, call, DEFAULT_TRAFFIC_FILE)
+
+    # one recording at a time, a new one replaces the running one
+    running: _TrafficRecording | None = hass.data.get(DATA_TRAFFIC_RECORDING)
+    if running is not None:
+        running.async_stop()
+
+    repositories = [
+        entry.runtime_data.device.repository
+        for entry in _async_get_target_entries(
+            hass, await async_extract_config_entry_ids(hass, call)
+        )
+        if entry.state is ConfigEntryState.LOADED
+    ]
+    hass.data[DATA_TRAFFIC_RECORDING] = _TrafficRecording(
+        hass, TrafficRecorder(path), repositories, call.data[ATTR_DURATION]
+    )
+    _LOGGER.info("Recording the traffic of %d airco's to %s", len(repositories), path)
+
+    return {CONF_PATH: path, "aircos": len(repositories)}
+
+
+async def _async_profile(call: ServiceCall) -> ServiceResponse:
+    """Profile the hot paths of the integration for a while"""
+    # nothing of the profiler is loaded, let alone running, until asked for
+    # pylint: disable=import-outside-toplevel
+    from .profiler import IntegrationProfiler, ProfilerBusyError
+
+    hass = call.hass
+    path = _async_output_path(hass, call, DEFAULT_PROFILE_FILE)
+    if DATA_PROFILER in hass.data:
+        raise ServiceValidationError("The integration is being profiled already")
+    if (detector := hass.data.get(DATA_STALL_DETECTOR)) and detector.active:
+        # its timing would end up in the profile
+        raise ServiceValidationError("Turn off the stall detection first")
+
+    profiler = IntegrationProfiler()
+    try:
+        profiler.start()
+    except ProfilerBusyError as error:
+        raise ServiceValidationError(f"Cannot profile: {error}") from error
+    hass.data[DATA_PROFILER] = profiler
+    duration: timedelta = call.data[ATTR_DURATION]
+    _LOGGER.info("Profiling the integration for %s", duration)
+
+    try:
+        await asyncio.sleep(duration.total_seconds())
+    finally:
+        profiler.stop()
+        hass.data.pop(DATA_PROFILER)
+
+    await hass.async_add_executor_job(profiler.dump, path)
+    _LOGGER.info("Wrote the profile of the integration to %s", path)
+
+    return {CONF_PATH: path, **profiler.report(call.data[ATTR_TOP])}
+
+
+async def _async_detect_stalls(call: ServiceCall) -> ServiceResponse:
+    """Turn the detection of sections holding up the event loop on or off"""
+    # pylint: disable=import-outside-toplevel
+    from .stall import StallDetector
+
+    hass = call.hass
+    detector: StallDetector | None = hass.data.get(DATA_STALL_DETECTOR)
+    if detector is not None and detector.active:
+        detector.stop()
+        _LOGGER.info("Stopped detecting stalls of the event loop")
+
+    if call.data[ATTR_ENABLED]:
+        if DATA_PROFILER in hass.data:
+            raise ServiceValidationError("Wait for the profiling to finish first")
+        # a fresh start, the counts of the previous detection are dropped
+        detector = StallDetector(call.data[ATTR_THRESHOLD] / 1000)
+        detector.start()
+        hass.data[DATA_STALL_DETECTOR] = detector
+        _LOGGER.info(
+            "Logging sections that hold up the event loop for more than %s ms",
+            call.data[ATTR_THRESHOLD],
+        )
+
+    # the counts stay available to the diagnostics after turning it off
+    return detector.as_dict() if detector is not None else {}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the domain services"""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROVISION,
+        _async_provision,
+        schema=PROVISION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEND_COMMAND,
+        _async_send_command,
+        schema=SEND_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        _async_record_traffic,
+        schema=RECORD_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DETECT_STALLS,
+        _async_detect_stalls,
+        schema=DETECT_STALLS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,105 @@
+"""Detect the integration holding up the event loop."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import time
+import traceback
+from typing import Any
+
+from .instrumentation import Patches, loop_sections
+
+_LOGGER = logging.getLogger(__name__)
+
+# callers shown when a section holds up the loop for too long
+_STACK_DEPTH = 8
+
+
+class StallDetector:
+    """Times every synchronous section the integration runs on the loop.
+
+    Every section gets its calls, total and longest time counted, as well as
+    how often it went over the threshold. A section over the threshold is
+    logged with the code that called it, unless it ran inside another timed
+    section, which is logged instead.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self._threshold = threshold
+        self._patches = Patches()
+        self._depth = 0
+        # calls, total seconds, longest call and calls over the threshold
+        self._sections: dict[str, list[float]] = {}
+
+    def start(self) -> None:
+        """Start timing the sections"""
+        self._patches.wrap(loop_sections(), self._wrap)
+
+    def stop(self) -> None:
+        """Stop timing, the counts are kept"""
+        self._patches.restore()
+
+    @property
+    def active(self) -> bool:
+        """Return True while the sections are timed"""
+        return bool(self._patches)
+
+    def as_dict(self) -> dict[str, Any]:
+        """The counts of every section, the slowest in total first"""
+        sections = sorted(
+            self._sections.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return {
+            "active": self.active,
+            "threshold_ms": round(self._threshold * 1000, 1),
+            "sections": {
+                name: {
+                    "calls": int(calls),
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total / calls * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                    "stalls": int(stalls),
+                }
+                for name, (calls, total, longest, stalls) in sections
+            },
+        }
+
+    def _wrap(self, func: Callable[..., Any], name: str) -> Callable[..., Any]:
+        def _timed(*args, **kwargs):
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                self._count(name, time.perf_counter() - start, args)
+
+        return _timed
+
+    def _count(self, name: str, seconds: float, args: tuple) -> None:
+        counts = self._sections.setdefault(name, [0, 0.0, 0.0, 0])
+        counts[0] += 1
+        counts[1] += seconds
+        counts[2] = max(counts[2], seconds)
+        if seconds < self._threshold:
+            return
+
+        counts[3] += 1
+        if self._depth:
+            return
+        # which entity or airco it was for, callbacks from the loop have no
+        # caller that tells
+        instance = args[0] if args else None
+        subject = getattr(instance, "entity_id", None) or getattr(
+            instance, "name", None
+        )
+        # leave out the wrapper and this method
+        stack = traceback.format_stack(limit=_STACK_DEPTH + 2)[:-2]
+        _LOGGER.warning(
+            "%s of %s held up the event loop for %.1f ms, called from:\n%s",
+            name,
+            subject,
+            seconds * 1000,
+            "".join(stack),
+        )
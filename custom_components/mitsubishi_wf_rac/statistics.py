@@ -0,0 +1,183 @@
+"""Hourly long-term statistics of the Electric counter."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, UnitOfEnergy
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .wfrac.device import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = timedelta(hours=1)
+
+
+def statistic_id(device: Device) -> str:
+    """Id of the external energy statistic of an airco"""
+    return f"{DOMAIN}:energy_{device.airco_id.lower()}"
+
+
+class EnergyStatistics:
+    """Buffers the Electric counter and imports it as hourly statistics.
+
+    The import resumes from the last imported hour, so restarts neither leave
+    a gap in the sum nor count anything twice. A counter that goes down is
+    treated as restarted from zero. The completed hours that are still
+    buffered are imported when it stops, the hour in progress is continued by
+    the samples after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, device: Device) -> None:
+        self._hass = hass
+        self._device = device
+        self._statistic_id = statistic_id(device)
+        self._samples: list[tuple[datetime, float]] = []
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        # last imported hour, with the counter and the sum at its end
+        self._last_start: datetime | None = None
+        self._last_state: float | None = None
+        self._last_sum = 0.0
+        self._unsubscribes: list[CALLBACK_TYPE] = []
+        self._remove_stop_listener: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> Callable[[], Coroutine[Any, Any, None]]:
+        """Start buffering and importing, returns a coroutine function to stop"""
+        self._record()
+        self._unsubscribes = [
+            self._device.add_listener(self._handle_device_update, {"Electric"}),
+            async_track_utc_time_change(
+                self._hass, self._async_import_hours, minute=0, second=30
+            ),
+        ]
+        self._remove_stop_listener = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_hass_stop
+        )
+        return self.async_stop
+
+    async def async_stop(self) -> None:
+        """Stop buffering and import the completed hours that are buffered"""
+        if self._remove_stop_listener is not None:
+            self._remove_stop_listener()
+            self._remove_stop_listener = None
+        while self._unsubscribes:
+            self._unsubscribes.pop()()
+        await self._async_import_hours(dt_util.utcnow())
+
+    async def _async_hass_stop(self, _event: Event) -> None:
+        # the listener is gone once it fired
+        self._remove_stop_listener = None
+        await self.async_stop()
+
+    @callback
+    def _handle_device_update(self, _changes: dict[str, Any]) -> None:
+        self._record()
+
+    def _record(self) -> None:
+        counter = getattr(self._device.airco, "Electric", None)
+        if counter is not None:
+            self._samples.append((dt_util.utcnow(), counter))
+
+    async def _async_import_hours(self, now: datetime) -> None:
+        """Import every completed hour that has samples, in one batch"""
+        # the recorder pulls in SQLAlchemy, so only import it once it is used
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        async with self._lock:
+            if not self._loaded:
+                await self._async_load_last_statistic()
+
+            current_hour = now.replace(minute=0, second=0, microsecond=0)
+            completed = [sample for sample in self._samples if sample[0] < current_hour]
+            if not completed:
+                return
+            self._samples = self._samples[len(completed) :]
+
+            # the counter at the end of every completed hour
+            hour_ends: dict[datetime, float] = {}
+            for timestamp, counter in completed:
+                hour_ends[timestamp.replace(minute=0, second=0, microsecond=0)] = counter
+
+            statistics = []
+            for start, counter in hour_ends.items():
+                if self._last_start is not None and start <= self._last_start:
+                    continue  # imported before a restart already
+                if self._last_state is not None:
+                    delta = counter - self._last_state
+                    self._last_sum += delta if delta >= 0 else counter
+                self._last_start = start
+                self._last_state = counter
+                statistics.append(
+                    StatisticData(start=start, state=counter, sum=self._last_sum)
+                )
+
+            if not statistics:
+                return
+
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{self._device.name} energy",
+                    source=DOMAIN,
+                    statistic_id=self._statistic_id,
+                    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+                ),
+                statistics,
+            )
+            _LOGGER.debug(
+                "Imported %d hours of energy statistics for airco [%s]",
+                len(statistics),
+                self._device.name,
+            )
+
+    async def _async_load_last_statistic(self) -> None:
+        """Continue from the last imported hour, if any"""
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics,
+            self._hass,
+            1,
+            self._statistic_id,
+            True,
+            {"state", "sum"},
+        )
+        self._loaded = True
+        if rows := last.get(self._statistic_id):
+            row = rows[0]
+            self._last_start = dt_util.utc_from_timestamp(row["start"])
+            self._last_state = row.get("state")
+            self._last_sum = row.get("sum") or 0.0
+
+
+@callback
+def async_setup_energy_statistics(
+    hass: HomeAssistant, device: Device
+) -> Callable[[], Coroutine[Any, Any, None]] | None:
+    """Import the energy counter of device as statistics, when it has one"""
+    if "recorder" not in hass.config.components:
+        return None
+    if getattr(device.airco, "Electric", None) is None:
+        return None
+    return EnergyStatistics(hass, device).async_start()
@@ -0,0 +1,318 @@
+"""Poll or command a fleet of airco's from the command line.
+
+    python benchmarks/wfrac_fleet.py units.json --rounds 10 --concurrency 16
+    python benchmarks/wfrac_fleet.py units.json --command Operation=false
+    python benchmarks/wfrac_fleet.py --replay traffic.jsonl --speed 100 --duration 60
+
+units.json is a list of {"host": ..., "port": ..., "airco_id": ...}, only host
+is required. With --replay the recorded exchanges of a TrafficRecorder are
+served instead of talking to real airco's, which makes this a load generator.
+Live statistics go to stderr every --interval seconds, the final report is
+written to stdout as JSON.
+
+benchmarks/wfrac_fleet.py is the entry point in a checkout, it makes the
+package importable with benchmarks/wfrac_loader.py. python -m wfrac only
+works where wfrac is importable on its own, like a copy of the package
+outside the integration folder. aiohttp is only needed without --replay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any
+from uuid import uuid4
+
+from .models.aircon import Aircon, AirconCommands, AirconStat
+from .rac_parser import RacParser
+from .repository import Repository
+from .transport import HttpTransport, ReplayTransport, Transport
+
+DEFAULT_PORT = 51443
+
+
+@dataclass
+class UnitStats:
+    """Latencies and errors of one unit"""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def add_error(self, error: BaseException) -> None:
+        """Count an error by its type"""
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self) -> dict[str, Any]:
+        """Counts and latency percentiles in ms"""
+        latencies = sorted(self.latencies)
+        errors = sum(self.errors.values())
+        result: dict[str, Any] = {
+            "requests": len(latencies) + errors,
+            "ok": len(latencies),
+            "errors": errors,
+        }
+        if self.errors:
+            result["error_types"] = dict(self.errors)
+        if latencies:
+            result.update(
+                {
+                    f"{name}_ms": round(_percentile(latencies, q) * 1000, 1)
+                    for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+                }
+            )
+            result["max_ms"] = round(latencies[-1] * 1000, 1)
+        return result
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RateLimiter:
+    """Spaces calls evenly to at most rate per second, None means unlimited"""
+
+    def __init__(self, rate: float | None) -> None:
+        self._interval = 1 / rate if rate else 0.0
+        self._next = time.monotonic()
+
+    async def wait(self) -> None:
+        """Wait for the next free slot"""
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+@dataclass
+class Unit:
+    """An airco and what is known about it"""
+
+    host: str
+    port: int
+    repository: Repository
+    airco_id: str | None = None
+    parser: RacParser = field(default_factory=RacParser)
+    airco: Aircon | None = None
+    stats: UnitStats = field(default_factory=UnitStats)
+
+
+async def _poll(unit: Unit) -> None:
+    response = await unit.repository.get_aircon_stats()
+    unit.airco = unit.parser.translate_bytes(response["airconStat"])
+
+
+async def _command(unit: Unit, params: dict[str, Any]) -> None:
+    if unit.airco is None:
+        await _poll(unit)
+    if unit.airco_id is None:
+        unit.airco_id = await unit.repository.get_airco_id()
+
+    airco_stat = AirconStat(unit.airco)
+    for key, value in params.items():
+        setattr(airco_stat, key, value)
+    response = await unit.repository.send_airco_command(
+        unit.airco_id, unit.parser.to_base64(airco_stat)
+    )
+    unit.airco = unit.parser.translate_bytes(response)
+
+
+def _parse_command(pairs: list[str]) -> dict[str, Any]:
+    """Turn Name=value pairs into airco command parameters"""
+    params: dict[str, Any] = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        command = AirconCommands(name)
+        if command in (AirconCommands.Operation, AirconCommands.Entrust):
+            params[command] = value.lower() in ("1", "true", "on", "yes")
+        elif command == AirconCommands.PresetTemp:
+            params[command] = float(value)
+        else:
+            params[command] = int(value)
+    return params
+
+
+def _load_units(options: argparse.Namespace, transport: Transport) -> list[Unit]:
+    if options.units:
+        entries = json.loads(Path(options.units).read_text(encoding="utf-8"))
+    elif isinstance(transport, ReplayTransport):
+        hosts = {(e["host"], e.get("port", DEFAULT_PORT)) for e in transport.exchanges}
+        entries = [{"host": host, "port": port} for host, port in sorted(hosts)]
+    else:
+        raise SystemExit("No units given")
+
+    interval = timedelta(seconds=options.min_interval)
+    return [
+        Unit(
+            entry["host"],
+            entry.get("port", DEFAULT_PORT),
+            Repository(
+                transport,
+                entry["host"],
+                entry.get("port", DEFAULT_PORT),
+                options.operator_id,
+                options.device_id,
+                min_time_between_requests=interval,
+            ),
+            entry.get("airco_id"),
+        )
+        for entry in entries
+    ]
+
+
+def _total(units: list[Unit]) -> UnitStats:
+    total = UnitStats()
+    for unit in units:
+        total.latencies.extend(unit.stats.latencies)
+        for name, count in unit.stats.errors.items():
+            total.errors[name] = total.errors.get(name, 0) + count
+    return total
+
+
+def _live_line(units: list[Unit], started: float) -> str:
+    summary = _total(units).summary()
+    elapsed = time.monotonic() - started
+    return (
+        f"{elapsed:7.1f}s {summary['requests']:6d} req "
+        f"{summary['requests'] / max(elapsed, 1e-9):7.1f}/s "
+        f"{summary['errors']:5d} err "
+        f"p50 {summary.get('p50_ms', 0):7.1f}ms p95 {summary.get('p95_ms', 0):7.1f}ms"
+    )
+
+
+async def _run(options: argparse.Namespace, transport: Transport) -> dict[str, Any]:
+    units = _load_units(options, transport)
+    params = _parse_command(options.command) if options.command else None
+    limiter = RateLimiter(options.rate)
+    started = time.monotonic()
+    deadline = started + options.duration if options.duration else None
+
+    jobs: asyncio.Queue[Unit | None] = asyncio.Queue(maxsize=options.concurrency * 2)
+
+    async def produce() -> None:
+        round_nr = 0
+        while options.rounds is None or round_nr < options.rounds:
+            for unit in units:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                await limiter.wait()
+                await jobs.put(unit)
+            else:
+                round_nr += 1
+                continue
+            break
+        for _ in range(options.concurrency):
+            await jobs.put(None)
+
+    async def work() -> None:
+        while (unit := await jobs.get()) is not None:
+            start = time.monotonic()
+            try:
+                if params is None:
+                    await _poll(unit)
+                else:
+                    await _command(unit, params)
+            except Exception as error:  # pylint: disable=broad-except
+                unit.stats.add_error(error)
+            else:
+                unit.stats.latencies.append(time.monotonic() - start)
+
+    async def report_live() -> None:
+        while True:
+            await asyncio.sleep(options.interval)
+            print(_live_line(units, started), file=sys.stderr)
+
+    live = asyncio.create_task(report_live())
+    try:
+        await asyncio.gather(
+            produce(), *(work() for _ in range(options.concurrency))
+        )
+    finally:
+        live.cancel()
+    print(_live_line(units, started), file=sys.stderr)
+
+    total = _total(units)
+    elapsed = time.monotonic() - started
+    return {
+        "mode": "command" if params is not None else "poll",
+        "units": len(units),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(total.latencies) / max(elapsed, 1e-9), 1),
+        "total": total.summary(),
+        "per_unit": {
+            f"{unit.host}:{unit.port}": unit.stats.summary() for unit in units
+        },
+    }
+
+
+async def _main(options: argparse.Namespace) -> dict[str, Any]:
+    if options.replay:
+        return await _run(options, ReplayTransport.load(options.replay, options.speed))
+
+    # only needed when talking to real airco's
+    import aiohttp  # pylint: disable=import-outside-toplevel
+
+    async with aiohttp.ClientSession() as session:
+        return await _run(options, HttpTransport(session))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="wfrac_fleet.py", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("units", nargs="?", help="JSON file with the airco's")
+    parser.add_argument(
+        "--command",
+        nargs="+",
+        metavar="NAME=VALUE",
+        help="send these AirconCommands instead of polling",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="requests per second, all units"
+    )
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=None, help="seconds")
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=None,
+        help="seconds between requests to one unit (default 1, 0 with --replay)",
+    )
+    parser.add_argument("--interval", type=float, default=5.0, help="live stats")
+    parser.add_argument("--replay", help="serve a recorded traffic file instead")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed, 0 for no latency"
+    )
+    parser.add_argument("--operator-id", default=str(uuid4()))
+    parser.add_argument("--device-id", default=uuid4().hex[:16])
+    parser.add_argument("--report", help="also write the JSON report to this file")
+    options = parser.parse_args(argv)
+
+    if options.rounds is None and options.duration is None:
+        options.rounds = 1
+    if options.min_interval is None:
+        options.min_interval = 0.0 if options.replay else 1.0
+    if options.speed == 0:
+        options.speed = None
+
+    report = asyncio.run(_main(options))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if options.report:
+        Path(options.report).write_text(text + "\n", encoding="utf-8")
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,35 @@
 """Device module"""
 
+from collections.abc import Callable, Hashable, Iterable
 from datetime import timedelta
 from typing import Any
+import asyncio
 import logging
+import time
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.util import Throttle
-
-from .rac_parser import RacParser
-from .repository import Repository
-from .models.aircon import Aircon, AirconStat
-
-from ..const import DOMAIN
+from .history import TelemetryHistory
+from .rac_parser import InvalidFrameError, RacParser
+from .repository import Repository, RequestCancelledError
+from .models.aircon import Aircon, AirconCommands, AirconStat
+from .transport import Transport
 
 _LOGGER = logging.getLogger(__name__)
 MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=60)
+# notify the unreachable listeners after this many failed updates in a row
+MAX_CONSECUTIVE_FAILURES = 3
+# commands that could not be sent are retried until they are this old
+QUEUED_COMMAND_MAX_AGE = timedelta(minutes=10)
+
+# fields besides the Aircon attributes that listeners can subscribe to
+FIELD_AVAILABLE = "available"
+FIELD_NUM_ACCOUNTS = "num_accounts"
+FIELD_HOST = "host"
+
+# keys of the frames that are always prepared
+FRAME_OFF = "off"
+FRAME_ON = "on"
+
+_MISSING = object()
 
 
 class Device:  # pylint: disable=too-many-instance-attributes
@@ -23,7 +37,7 @@ class Device:  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
         self,
-        hass: HomeAssistant,
+        transport: Transport,
         name: str,
         hostname: str,
         port: int,
@@ -31,9 +45,8 @@ class Device:  # pylint: disable=too-many-instance-attributes
         operator_id: str,
         airco_id: str,
     ) -> None:
-        self._api = Repository(hass, hostname, port, operator_id, device_id)
+        self._api = Repository(transport, hostname, port, operator_id, device_id)
         self._parser = RacParser()
-        self._hass = hass
 
         # self._airco = None
         self._airco = Aircon()
@@ -46,11 +59,55 @@ class Device:  # pylint: disable=too-many-instance-attributes
         self._name = name
         self._firmware = ""
         self._connected_accounts = -1
+        self._consecutive_failures = 0
+        self._unreachable_listeners: list[Callable[[], None]] = []
+        self._listeners: list[
+            tuple[Callable[[dict[str, Any]], None], frozenset[str] | None]
+        ] = []
+        self._pending_changes: dict[str, Any] | None = None
+        # commands that are encoded ahead, so sending them is just the request
+        self._frame_params: dict[Hashable, dict[str, Any]] = {
+            FRAME_OFF: {AirconCommands.Operation: False},
+            FRAME_ON: {AirconCommands.Operation: True},
+        }
+        self._frames: dict[Hashable, str] = {}
+        # latest desired state that could not be sent, merged into one command
+        self._queued_params: dict[str, Any] = {}
+        # when each queued value was queued
+        self._queued_at: dict[str, float] = {}
+        self._history = TelemetryHistory()
+        self._rejected_frames = 0
+        self._updating = False
+        self._last_update: float | None = None
+
+    async def update(self, no_throttle: bool = False):
+        """Update the device information from API
+
+        Skipped when an update is running already, or when the last one was
+        less than MIN_TIME_BETWEEN_UPDATES ago, unless no_throttle is set.
+        """
+        if self._updating:
+            return
+        now = time.monotonic()
+        if (
+            not no_throttle
+            and self._last_update is not None
+            and now - self._last_update < MIN_TIME_BETWEEN_UPDATES.total_seconds()
+        ):
+            return
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def update(self):
-        """Update the device information from API"""
-
+        self._updating = True
+        self._last_update = now
+        try:
+            previous = self._state()
+            await self._update()
+            if self._available and self._queued_params:
+                await self.set_airco({})
+            self._publish_changes(previous)
+        finally:
+            self._updating = False
+
+    async def _update(self):
         try:
             response = await self._api.get_aircon_stats()
 
@@ -58,22 +115,40 @@ class Device:  # pylint: disable=too-many-instance-attributes
                 self._available = False
                 _LOGGER.warning("Received no data for device %s", self._airco_id)
                 return
+        except RequestCancelledError:
+            _LOGGER.debug("Update of airco [%s] was cancelled", self.name)
+            return
         except Exception:  # pylint: disable=broad-except
             self._available = False
             _LOGGER.exception(
                 "Error: something went wrong updating the airco [%s] values", self.name
             )
+            self._connection_failed()
             return
 
+        self._consecutive_failures = 0
+
         try:
             self._connected_accounts = int(response["numOfAccount"])
             # pylint: disable = line-too-long
             self._firmware = f'{response["firmType"]}, mcu: {response["mcu"]["firmVer"]}, wireless: {response["wireless"]["firmVer"]}'
             self._airco = self._parser.translate_bytes(response["airconStat"])
             self._available = True
+        except InvalidFrameError as error:
+            self._frame_rejected(error)
+            return
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Could not parse airco data")
             self._available = False
+            return
+
+        if self._parser.unknown_tags is None:
+            # the first frame tells which extra records this airco has, the
+            # parser only has to look for those from now on
+            self._parser.unknown_tags = frozenset(self._airco.UnknownRecords)
+
+        self._history.append(time.time(), self._airco)
+        self._build_frames()
 
     async def delete_account(self):
         """Delete account (operator id) from the airco"""
@@ -82,55 +157,253 @@ class Device:  # pylint: disable=too-many-instance-attributes
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Could not delete account from airco %s", self._airco_id)
 
-    async def add_account(self):
+    async def add_account(self, time_zone: str):
         """Add account (operator id) from the airco"""
         try:
-            return await self._api.update_account_info(
-                self._airco_id, self._hass.config.time_zone
-            )
+            return await self._api.update_account_info(self._airco_id, time_zone)
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Could not add account from airco %s", self._airco_id)
 
-    async def set_airco(self, params: dict[str, Any]) -> None:
-        """Private method to send airco command"""
-
-        if self.airco is None:
-            await self._hass.async_add_executor_job(self.update)
+    async def set_airco(self, params: dict[str, Any]) -> bool:
+        """Send an airco command, returns True when the airco accepted it"""
 
         if self._airco is None:
             raise ValueError()
 
+        # newer values win, but what is still queued is sent along
+        queued, queued_at = self._take_queued_params()
+        for key in params:
+            queued_at.pop(key, None)
+        params = queued | params
+        if not params:
+            return True
+
+        return await self._send_command(self._encode(params), params, queued_at)
+
+    async def send_frame(self, key: Hashable) -> bool:
+        """Send a prepared command, falls back to encoding it when not ready yet"""
+        command = self._frames.get(key)
+        if command is None or self._queued_params:
+            return await self.set_airco(self._frame_params[key])
+
+        return await self._send_command(command, self._frame_params[key])
+
+    def _queue_params(
+        self, params: dict[str, Any], queued_at: dict[str, float] | None = None
+    ) -> None:
+        """Keep params to send once the airco can be reached again.
+
+        queued_at has the time the params that were queued before were first
+        queued, the others are queued from now.
+        """
+        self._queued_params.update(params)
+        now = time.monotonic()
+        for key in params:
+            self._queued_at[key] = (queued_at or {}).get(key, now)
+
+    def _take_queued_params(self) -> tuple[dict[str, Any], dict[str, float]]:
+        """Return and forget the queued params that are not too old, with their times"""
+        params, self._queued_params = self._queued_params, {}
+        queued_at, self._queued_at = self._queued_at, {}
+        oldest = time.monotonic() - QUEUED_COMMAND_MAX_AGE.total_seconds()
+        expired = {key: params[key] for key in params if queued_at[key] < oldest}
+        if expired:
+            _LOGGER.info(
+                "Dropped queued command %s for airco [%s], it is too old",
+                expired,
+                self.name,
+            )
+        return (
+            {key: value for key, value in params.items() if key not in expired},
+            {key: queued_at[key] for key in params if key not in expired},
+        )
+
+    def set_frame_params(self, key: Hashable, params: dict[str, Any]) -> None:
+        """Prepare the command for params, so it can be sent with send_frame"""
+        self._frame_params[key] = params
+        self._frames.pop(key, None)
+        if self._available:
+            self._build_frame(key)
+
+    def frame_params(self, key: Hashable) -> dict[str, Any]:
+        """Return the parameters of a prepared command"""
+        return dict(self._frame_params[key])
+
+    def remove_frame_params(self, key: Hashable) -> None:
+        """Forget a prepared command"""
+        self._frame_params.pop(key, None)
+        self._frames.pop(key, None)
+
+    def _build_frames(self) -> None:
+        """Encode all prepared commands against the latest airco values"""
+        self._frames.clear()
+        for key in self._frame_params:
+            self._build_frame(key)
+
+    def _build_frame(self, key: Hashable) -> None:
+        try:
+            self._frames[key] = self._encode(self._frame_params[key])
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not prepare command %s for airco [%s]", key, self.name)
+
+    def _encode(self, params: dict[str, Any]) -> str:
+        """Encode the current airco values, with params applied, as a command"""
         airco_stat = AirconStat(self._airco)
 
         for key, value in params.items():
             setattr(airco_stat, key, value)
 
-        command = self._parser.to_base64(airco_stat)
+        return self._parser.to_base64(airco_stat)
+
+    async def _send_command(
+        self,
+        command: str,
+        params: dict[str, Any],
+        queued_at: dict[str, float] | None = None,
+    ) -> bool:
+        previous = self._state()
+
         try:
             response = await self._api.send_airco_command(self._airco_id, command)
         except ValueError:  # pylint: disable=broad-except
             _LOGGER.exception("Airco object is empty!")
-            return
+            return False
+        except RequestCancelledError:
+            _LOGGER.debug("Sending command to airco [%s] was cancelled", self.name)
+            return False
         except Exception:  # pylint: disable=broad-except
-            _LOGGER.exception("Could not send airco data")
+            _LOGGER.exception(
+                "Could not send airco data, it is sent again once airco [%s] responds",
+                self.name,
+            )
+            self._queue_params(params, queued_at)
+            return False
+
+        try:
+            self._airco = self._parser.translate_bytes(response)
+        except InvalidFrameError as error:
+            # the command did arrive, only its reply is unusable
+            self._frame_rejected(error)
+            return True
+
+        self._build_frames()
+        self._publish_changes(previous)
+        return True
+
+    def _frame_rejected(self, error: InvalidFrameError) -> None:
+        """Count a corrupted frame, the previous airco values are kept"""
+        self._rejected_frames += 1
+        _LOGGER.warning(
+            "Ignored a corrupted frame from airco [%s] (%d so far): %s",
+            self.name,
+            self._rejected_frames,
+            error,
+        )
+
+    def _state(self) -> dict[str, Any]:
+        """Return a flat snapshot of all fields listeners can subscribe to"""
+        return {
+            **vars(self._airco),
+            FIELD_AVAILABLE: self._available,
+            FIELD_NUM_ACCOUNTS: self._connected_accounts,
+            FIELD_HOST: self._host,
+        }
+
+    def _publish_changes(self, previous: dict[str, Any]) -> None:
+        """Schedule notifying the listeners of the fields that changed since previous.
+
+        All changes made within one event loop iteration are merged, and every
+        affected listener is called once in the next iteration.
+        """
+        current = self._state()
+        changes = {
+            key: current.get(key)
+            for key in previous.keys() | current.keys()
+            if previous.get(key, _MISSING) != current.get(key, _MISSING)
+        }
+        if not changes:
             return
 
-        self._airco = self._parser.translate_bytes(response)
+        if self._pending_changes is None:
+            self._pending_changes = {}
+            asyncio.get_running_loop().call_soon(self._dispatch_changes)
+        self._pending_changes.update(changes)
+
+    def _dispatch_changes(self) -> None:
+        """Call all listeners of the pending changes, in one go"""
+        changes = self._pending_changes or {}
+        self._pending_changes = None
+
+        for listener, fields in list(self._listeners):
+            if fields is None or not fields.isdisjoint(changes):
+                listener(changes)
+
+    def add_listener(
+        self,
+        listener: Callable[[dict[str, Any]], None],
+        fields: Iterable[str] | None = None,
+    ) -> Callable[[], None]:
+        """Call listener with the changed fields when any of fields changes.
+
+        Without fields, the listener is called for every change. Returns a
+        function that removes the listener.
+        """
+        registration = (listener, None if fields is None else frozenset(fields))
+        self._listeners.append(registration)
+
+        def remove_listener() -> None:
+            self._listeners.remove(registration)
+
+        return remove_listener
+
+    async def async_close(self) -> None:
+        """Cancel all pending requests to the airco"""
+        await self._api.async_close()
+
+    def _connection_failed(self) -> None:
+        """Count a failed update and notify listeners when the airco seems gone"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures % MAX_CONSECUTIVE_FAILURES:
+            return
+
+        _LOGGER.info(
+            "Airco [%s] at %s failed %d updates in a row",
+            self.name,
+            self._host,
+            self._consecutive_failures,
+        )
+        for listener in list(self._unreachable_listeners):
+            listener()
+
+    def add_unreachable_listener(
+        self, listener: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Call listener after repeated connection failures, returns a remove function"""
+        self._unreachable_listeners.append(listener)
+
+        def remove_listener() -> None:
+            self._unreachable_listeners.remove(listener)
+
+        return remove_listener
+
+    def set_host(self, hostname: str) -> None:
+        """Change the host (IP) of the airco without recreating the device"""
+        previous = self._state()
+        self._host = hostname
+        self._api.hostname = hostname
+        self._consecutive_failures = 0
+        self._publish_changes(previous)
 
     def set_available(self, available: bool):
         """Set available status"""
+        previous = self._state()
         self._available = available
+        self._publish_changes(previous)
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return a device description for device registry."""
-        return {
-            "sw_version": self._firmware,
-            "identifiers": {(DOMAIN, self.airco_id)},
-            "manufacturer": "Mitsubishi (WF-RAC)",
-            # "model": self.airco.ModelNr,
-            "name": self.name,
-        }
+    def firmware(self) -> str:
+        """Return the firmware versions of the airco"""
+        return self._firmware
 
     @property
     def operator_id(self) -> str:
@@ -162,6 +435,11 @@ class Device:  # pylint: disable=too-many-instance-attributes
         """Get given Airco name"""
         return self._name
 
+    @property
+    def repository(self) -> Repository:
+        """Return the repository that talks to the airco"""
+        return self._api
+
     @property
     def airco_id(self) -> str:
         """Return Airco ID"""
@@ -172,6 +450,16 @@ class Device:  # pylint: disable=too-many-instance-attributes
         """Return parsed Aircon object if set otherwise None"""
         return self._airco
 
+    @property
+    def rejected_frames(self) -> int:
+        """Return how many corrupted frames the airco sent"""
+        return self._rejected_frames
+
+    @property
+    def history(self) -> TelemetryHistory:
+        """Return the history of the polled airco values"""
+        return self._history
+
     @property
     def available(self) -> bool:
         """Return True if device is available"""
@@ -0,0 +1,73 @@
+"""Estimate the power usage of an airco from its energy counter"""
+
+from collections import deque
+
+# the counter steps are coarse (0.25 kWh), so average over a long window
+DEFAULT_WINDOW = 3600.0
+
+
+class PowerEstimator:
+    """Average power (W) over the recent steps of a cumulative kWh counter.
+
+    Only the moments the counter changes are used, so the estimate does not
+    depend on how often the counter is read. A counter that goes down is
+    treated as restarted from zero.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._counter: float | None = None
+        self._total = 0.0
+        # (timestamp, kWh counted since the first reading) of every counter step
+        self._steps: deque[tuple[float, float]] = deque()
+
+    def add(self, timestamp: float, counter: float | None) -> bool:
+        """Add a counter reading in kWh, returns True when the counter changed"""
+        if counter is None or counter == self._counter:
+            return False
+
+        if self._counter is None:
+            # when the counter got to this value is unknown, wait for a step
+            self._counter = counter
+            return False
+
+        delta = counter - self._counter
+        self._total += delta if delta >= 0 else counter
+        self._counter = counter
+        self._steps.append((timestamp, self._total))
+
+        # keep at least two steps, so there is always an interval to average over
+        while len(self._steps) > 2 and timestamp - self._steps[0][0] > self._window:
+            self._steps.popleft()
+        return True
+
+    def reset(self) -> None:
+        """Forget all readings"""
+        self._counter = None
+        self._total = 0.0
+        self._steps.clear()
+
+    def power(self, now: float) -> float | None:
+        """Average power in W at now, from the counter steps in the window.
+
+        A counter that has not stepped for a while lowers the estimate: less
+        than one more step can have been used since the last one, so the
+        average is capped by that. Once no step came within the window, the
+        airco is taken to use nothing.
+        """
+        if not self._steps:
+            return None
+        (first_time, first_total), (last_time, last_total) = (
+            self._steps[0],
+            self._steps[-1],
+        )
+        silence = now - last_time
+        if silence > self._window:
+            return 0.0
+        if last_time <= first_time:
+            return None
+
+        span = last_time - first_time
+        used = last_total - first_total
+        step = used / (len(self._steps) - 1)
+        return min(used / span, (used + step) / (span + max(silence, 0.0))) * 3_600_000
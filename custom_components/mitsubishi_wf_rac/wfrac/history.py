@@ -0,0 +1,105 @@
+"""Fixed size history of the decoded airco values"""
+
+from array import array
+import math
+from typing import Any
+
+from .models.aircon import Aircon
+
+DEFAULT_CAPACITY = 1440  # one day of polls, once a minute
+
+# mode stored for samples where the airco is turned off
+MODE_OFF = -1
+
+# column name and array type code of every sample field
+_COLUMNS = (
+    ("timestamp", "d"),
+    ("indoor_temp", "f"),
+    ("outdoor_temp", "f"),
+    ("preset_temp", "f"),
+    ("mode", "b"),
+    ("electric", "d"),
+)
+
+
+class TelemetryHistory:
+    """Ring buffer of airco samples, stored in typed arrays per column.
+
+    Memory use is fixed at bytes_per_sample * capacity, the oldest sample is
+    overwritten once the buffer is full. Missing values are stored as NaN.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._capacity = capacity
+        self._columns = {
+            name: array(typecode, bytes(array(typecode).itemsize * capacity))
+            for name, typecode in _COLUMNS
+        }
+        self._next = 0
+        self._size = 0
+
+    def append(self, timestamp: float, airco: Aircon) -> None:
+        """Add a sample of airco, taken at timestamp (unix time)"""
+        i = self._next
+        columns = self._columns
+        columns["timestamp"][i] = timestamp
+        columns["indoor_temp"][i] = _value(airco, "IndoorTemp")
+        columns["outdoor_temp"][i] = _value(airco, "OutdoorTemp")
+        columns["preset_temp"][i] = _value(airco, "PresetTemp")
+        columns["mode"][i] = (
+            airco.OperationMode if getattr(airco, "Operation", False) else MODE_OFF
+        )
+        columns["electric"][i] = _value(airco, "Electric")
+
+        self._next = (i + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def samples(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return the samples as dicts, oldest first, optionally only the newest limit"""
+        count = self._size if limit is None else min(limit, self._size)
+        start = (self._next - count) % self._capacity
+        samples = []
+        for offset in range(count):
+            i = (start + offset) % self._capacity
+            sample = {}
+            for name, column in self._columns.items():
+                value = column[i]
+                if column.typecode == "f":
+                    # undo the single precision noise, the airco uses 0.1 steps
+                    value = round(value, 2)
+                sample[name] = (
+                    None if isinstance(value, float) and math.isnan(value) else value
+                )
+            samples.append(sample)
+        return samples
+
+    def clear(self) -> None:
+        """Forget all samples"""
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of samples kept"""
+        return self._capacity
+
+    @property
+    def bytes_per_sample(self) -> int:
+        """Memory used by one sample"""
+        return sum(column.itemsize for column in self._columns.values())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all columns"""
+        return self.bytes_per_sample * self._capacity
+
+
+def _value(airco: Aircon, name: str) -> float:
+    value = getattr(airco, name, None)
+    return math.nan if value is None else value
@@ -1,6 +1,6 @@
 """Aircon Base"""
 
-from aenum import StrEnum
+from enum import StrEnum
 
 
 class AirconCommands(StrEnum):
@@ -43,6 +43,8 @@ class Aircon(AirconBase):
     OutdoorTemp: float
     Electric: float | None
     ErrorCode: str
+    # value of the sensor records with a tag the parser does not know, by tag
+    UnknownRecords: dict[str, int]
 
 
 class AirconStat(AirconBase):
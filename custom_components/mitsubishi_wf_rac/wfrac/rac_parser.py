@@ -1,13 +1,98 @@
 """WF-RAC parser to decode and ecode wf-rac strings"""
 
+from __future__ import annotations
+
 from base64 import b64decode, b64encode
-from .utils import find_match, indoorTempList, outdoorTempList
+from binascii import crc_hqx
+from dataclasses import dataclass
+import functools
+import struct
+from typing import Any
+
+from .utils import indoorTempList, outdoorTempList
 from .models.aircon import Aircon, AirconStat
 
+# Lookup tables from airco values to the bits that encode them, for the command
+# and receive part of a frame. Vertical wind direction sets (byte 2, byte 3) and
+# horizontal wind direction sets (byte 12, byte 11).
+_COMMAND_OPERATION_MODE = {0: 32, 1: 40, 2: 48, 3: 44, 4: 36}
+_COMMAND_AIRFLOW = {0: 15, 1: 8, 2: 9, 3: 10, 4: 14}
+_COMMAND_WIND_DIRECTION_UD = {
+    0: (192, 128),
+    1: (128, 128),
+    2: (128, 144),
+    3: (128, 160),
+    4: (128, 176),
+}
+_COMMAND_WIND_DIRECTION_LR = {
+    0: (3, 16),
+    1: (2, 16),
+    2: (2, 17),
+    3: (2, 18),
+    4: (2, 19),
+    5: (2, 20),
+    6: (2, 21),
+    7: (2, 22),
+}
+_RECEIVE_OPERATION_MODE = {1: 8, 2: 16, 3: 12, 4: 4}
+_RECEIVE_AIRFLOW = {0: 7, 2: 1, 3: 2, 4: 6}
+_RECEIVE_WIND_DIRECTION_UD = {0: (64, 0), 2: (0, 16), 3: (0, 32), 4: (0, 48)}
+_RECEIVE_WIND_DIRECTION_LR = {
+    0: (1, 0),
+    2: (0, 1),
+    3: (0, 2),
+    4: (0, 3),
+    5: (0, 4),
+    6: (0, 5),
+    7: (0, 6),
+}
+
+# Lookup tables from the (masked) received bits to the airco values
+_DECODE_OPERATION_MODE = {8: 1, 16: 2, 12: 3, 4: 4}
+_DECODE_AIRFLOW = {7: 0, 0: 1, 1: 2, 2: 3, 6: 4}
+_DECODE_WIND_DIRECTION_UD = {0: 1, 16: 2, 32: 3, 48: 4}
+_DECODE_WIND_DIRECTION_LR = {0: 1, 1: 2, 2: 3, 3: 4, 4: 5, 5: 6, 6: 7}
+_DECODE_MODEL_NR = {0: 0, 1: 1, 2: 2}
+
+# a segment is 18 status bytes, a record count, 4 bytes per record and a CRC16
+_SEGMENT_OVERHEAD = 18 + 1 + 2
+
+
+def crc16(data) -> int:
+    """CRC16-CCITT (initial value 0xFFFF) of data"""
+    # crc_hqx is the table driven CRC16-CCITT of the standard library
+    return crc_hqx(bytes(data), 0xFFFF)
+
+
+class InvalidFrameError(ValueError):
+    """Raised for a frame with a wrong length or CRC"""
+
+
+def validate_frame(raw: bytes) -> None:
+    """Check the length and CRC of both segments of a frame"""
+    view = memoryview(raw)
+    start = 0
+    for segment in ("first", "second"):
+        if len(raw) < start + _SEGMENT_OVERHEAD:
+            raise InvalidFrameError(f"{segment} segment is truncated")
+        end = start + _SEGMENT_OVERHEAD + raw[start + 18] * 4
+        if len(raw) < end:
+            raise InvalidFrameError(f"{segment} segment is truncated")
+        # a view, so the CRC runs over the frame without copying the segment
+        if crc_hqx(view[start : end - 2], 0xFFFF) != raw[end - 2] | raw[end - 1] << 8:
+            raise InvalidFrameError(f"{segment} segment has a wrong CRC")
+        start = end
+    if len(raw) != start:
+        raise InvalidFrameError(f"{len(raw) - start} bytes after the second segment")
+
 
 class RacParser:
     """Parser class that is used to parse WF-RAC data"""
 
+    _previous: _DecodedFrame | None = None
+    # unknown record tags to look for, None keeps all of them
+    unknown_tags: frozenset[str] | None = None
+
     def to_base64(self, aircon_stat: AirconStat):
         """Convert to Base64 string"""
         command = RacParser.add_crc16(
@@ -40,71 +125,24 @@ class RacParser:
             stat_byte[2] |= 2
 
         # Operating Mode
-        if aircon_stat.OperationMode == 0:
-            stat_byte[2] |= 32
-        elif aircon_stat.OperationMode == 1:
-            stat_byte[2] |= 40
-        elif aircon_stat.OperationMode == 2:
-            stat_byte[2] |= 48
-        elif aircon_stat.OperationMode == 3:
-            stat_byte[2] |= 44
-        elif aircon_stat.OperationMode == 4:
-            stat_byte[2] |= 36
+        stat_byte[2] |= _COMMAND_OPERATION_MODE.get(aircon_stat.OperationMode, 0)
 
         # airflow
-        if aircon_stat.AirFlow == 0:
-            stat_byte[3] |= 15
-        elif aircon_stat.AirFlow == 1:
-            stat_byte[3] |= 8
-        elif aircon_stat.AirFlow == 2:
-            stat_byte[3] |= 9
-        elif aircon_stat.AirFlow == 3:
-            stat_byte[3] |= 10
-        elif aircon_stat.AirFlow == 4:
-            stat_byte[3] |= 14
+        stat_byte[3] |= _COMMAND_AIRFLOW.get(aircon_stat.AirFlow, 0)
 
         # Vertical wind direction
-        if aircon_stat.WindDirectionUD == 0:
-            stat_byte[2] |= 192
-            stat_byte[3] |= 128
-        elif aircon_stat.WindDirectionUD == 1:
-            stat_byte[2] |= 128
-            stat_byte[3] |= 128
-        elif aircon_stat.WindDirectionUD == 2:
-            stat_byte[2] |= 128
-            stat_byte[3] |= 144
-        elif aircon_stat.WindDirectionUD == 3:
-            stat_byte[2] |= 128
-            stat_byte[3] |= 160
-        elif aircon_stat.WindDirectionUD == 4:
-            stat_byte[2] |= 128
-            stat_byte[3] |= 176
+        byte_2, byte_3 = _COMMAND_WIND_DIRECTION_UD.get(
+            aircon_stat.WindDirectionUD, (0, 0)
+        )
+        stat_byte[2] |= byte_2
+        stat_byte[3] |= byte_3
 
         # Horizontal wind direction
-        if aircon_stat.WindDirectionLR == 0:
-            stat_byte[12] |= 3
-            stat_byte[11] |= 16
-        elif aircon_stat.WindDirectionLR == 1:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 16
-        elif aircon_stat.WindDirectionLR == 2:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 17
-        elif aircon_stat.WindDirectionLR == 3:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 18
-        elif aircon_stat.WindDirectionLR == 4:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 19
-        elif aircon_stat.WindDirectionLR == 5:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 20
-        elif aircon_stat.WindDirectionLR == 6:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 21
-        elif aircon_stat.WindDirectionLR == 7:
-            stat_byte[12] |= 2
-            stat_byte[11] |= 22
+        byte_12, byte_11 = _COMMAND_WIND_DIRECTION_LR.get(
+            aircon_stat.WindDirectionLR, (0, 0)
+        )
+        stat_byte[12] |= byte_12
+        stat_byte[11] |= byte_11
 
         # preset temp
         # preset_temp = 25.0 if aircon_stat.OperationMode == 3 else aircon_stat.PresetTemp
@@ -144,52 +182,24 @@ class RacParser:
             stat_byte[2] |= 1
 
         # Operating Mode
-        if aircon_stat.OperationMode == 1:
-            stat_byte[2] |= 8
-        elif aircon_stat.OperationMode == 2:
-            stat_byte[2] |= 16
-        elif aircon_stat.OperationMode == 3:
-            stat_byte[2] |= 12
-        elif aircon_stat.OperationMode == 4:
-            stat_byte[2] |= 4
+        stat_byte[2] |= _RECEIVE_OPERATION_MODE.get(aircon_stat.OperationMode, 0)
 
         # airflow
-        if aircon_stat.AirFlow == 0:
-            stat_byte[3] |= 7
-        elif aircon_stat.AirFlow == 2:
-            stat_byte[3] |= 1
-        elif aircon_stat.AirFlow == 3:
-            stat_byte[3] |= 2
-        elif aircon_stat.AirFlow == 4:
-            stat_byte[3] |= 6
+        stat_byte[3] |= _RECEIVE_AIRFLOW.get(aircon_stat.AirFlow, 0)
 
         # Vertical wind direction
-        if aircon_stat.WindDirectionUD == 0:
-            stat_byte[2] |= 64
-        elif aircon_stat.WindDirectionUD == 2:
-            stat_byte[3] |= 16
-        elif aircon_stat.WindDirectionUD == 3:
-            stat_byte[3] |= 32
-        elif aircon_stat.WindDirectionUD == 4:
-            stat_byte[3] |= 48
+        byte_2, byte_3 = _RECEIVE_WIND_DIRECTION_UD.get(
+            aircon_stat.WindDirectionUD, (0, 0)
+        )
+        stat_byte[2] |= byte_2
+        stat_byte[3] |= byte_3
 
         # Horizontal wind direction
-        if aircon_stat.WindDirectionLR == 0:
-            stat_byte[12] |= 1
-        elif aircon_stat.WindDirectionLR == 1:
-            stat_byte[11] |= 0
-        elif aircon_stat.WindDirectionLR == 2:
-            stat_byte[11] |= 1
-        elif aircon_stat.WindDirectionLR == 3:
-            stat_byte[11] |= 2
-        elif aircon_stat.WindDirectionLR == 4:
-            stat_byte[11] |= 3
-        elif aircon_stat.WindDirectionLR == 5:
-            stat_byte[11] |= 4
-        elif aircon_stat.WindDirectionLR == 6:
-            stat_byte[11] |= 5
-        elif aircon_stat.WindDirectionLR == 7:
-            stat_byte[11] |= 6
+        byte_12, byte_11 = _RECEIVE_WIND_DIRECTION_LR.get(
+            aircon_stat.WindDirectionLR, (0, 0)
+        )
+        stat_byte[12] |= byte_12
+        stat_byte[11] |= byte_11
 
         # preset temp
         # preset_temp = 25.0 if aircon_stat.OperationMode == 3 else aircon_stat.PresetTemp
@@ -219,85 +229,52 @@ class RacParser:
         return stat_byte
 
     def translate_bytes(self, input_string: str) -> Aircon:
-        """Translate bytes"""
+        """Translate bytes
+
+        The status block and the sensor records are each decoded only when
+        they differ from the previous frame this parser translated, otherwise
+        their fields are carried over. Raises InvalidFrameError for a frame
+        with a wrong length or CRC.
+        """
 
         ac_device: Aircon = Aircon()
         # convert to byte array
-        content_byte_array = b64decode(bytearray(input_string, encoding="UTF"))
-        # Convert to signed integers instead of bytes
-        content_byte_array = [
-            (256 - a) * (-1) if a > 127 else a for a in content_byte_array
-        ]
+        try:
+            raw = b64decode(input_string)
+        except ValueError as error:
+            raise InvalidFrameError(f"not base64: {error}") from error
+        validate_frame(raw)
 
         # get te start of the first bytearray segment we use
-        start_length = content_byte_array[18] * 4 + 21
-        # copy the bytearray segment to variable
-        content = content_byte_array[start_length : start_length + 18]
-
-        # get the current ac operation (3th value and with byte 3)
-        ac_device.Operation = 1 == (3 & content[2])
-        # get preset temp: 5th byte divided by 2
-        ac_device.PresetTemp = content[4] / 2
-        # get operation mode: check if 3th byte and byte 60 matches 8,16,12 or 4 (add 1)
-        ac_device.OperationMode = find_match(60 & content[2], 8, 16, 12, 4) + 1
-        ac_device.AirFlow = find_match(15 & content[3], 7, 0, 1, 2, 6)
-        ac_device.WindDirectionUD = (
-            0
-            if content[2] & 192 == 64
-            else find_match(240 & content[3], 0, 16, 32, 48) + 1
-        )
-        ac_device.WindDirectionLR = (
-            0
-            if content[12] & 3 == 1
-            else find_match(31 & content[11], 0, 1, 2, 3, 4, 5, 6) + 1
-        )
-        ac_device.Entrust = 4 == (12 & content[12])
-        ac_device.CoolHotJudge = (content[8] & 8) <= 0
-        ac_device.ModelNr = find_match(content[0] & 127, 0, 1, 2)
-        ac_device.Vacant = (content[10] & 1) != 0
-        code = content[6] & 127
-        ac_device.ErrorCode = (
-            "00"
-            if code == 0
-            else f"M{code:02d}"
-            if (content[6] & -128) <= 0
-            else "E" + str(code)
-        )
-
-        vals = content_byte_array[start_length + 19 : len(content_byte_array) - 2]
-        ac_device.Electric = None
-        for i in range(0, len(vals), 4):
-            if vals[i] == -128 and vals[i + 1] == 16:
-                ac_device.OutdoorTemp = outdoorTempList[vals[i + 2] & 0xFF]
-            if vals[i] == -128 and vals[i + 1] == 32:
-                ac_device.IndoorTemp = indoorTempList[vals[i + 2] & 0xFF]
-            if vals[i] == -108 and vals[i + 1] == 16:
-                ac_device.Electric = (
-                    int.from_bytes(
-                        [(v + 256) % 256 for v in vals[i + 2 : i + 4]],
-                        "little",
-                        signed=False,
-                    )
-                    * 0.25
-                )
+        start_length = raw[18] * 4 + 21
+        status = raw[start_length : start_length + 18]
+        records = raw[start_length + 19 : -2]
 
+        previous = self._previous
+        if previous is not None and status == previous.status:
+            status_fields = previous.status_fields
+        else:
+            status_fields = _decode_status(status)
+        if previous is not None and records == previous.records:
+            record_fields = previous.record_fields
+        else:
+            record_fields = _decode_records(records, self.unknown_tags)
+        self._previous = _DecodedFrame(status, records, status_fields, record_fields)
+
+        fields = ac_device.__dict__
+        fields.update(status_fields)
+        fields.update(record_fields)
+        # the only mutable field, the next frame may carry it over
+        ac_device.UnknownRecords = dict(ac_device.UnknownRecords)
         return ac_device
 
+    def reset(self) -> None:
+        """Forget the previous frame, the next one is decoded completely"""
+        self._previous = None
+
     def crc16ccitt(self, data):
-        """Convert to signed integers instead of bytes"""
-        data = [(256 - a) * (-1) if a > 127 else a for a in data]
-
-        i = 65535
-        for b in data:
-            for i2 in range(8):
-                z = True
-                z2 = ((b >> (7 - i2)) & 1) == 1
-                if ((i >> 15) & 1) != 1:
-                    z = False
-                i = i << 1
-                if z2 ^ z:
-                    i ^= 4129
-        return i & 65535
+        """CRC16-CCITT of data"""
+        return crc16(data)
 
     def add_crc16(self, byte_buffer: bytearray):
         """add crc to buffer"""
@@ -305,3 +282,104 @@ class RacParser:
 
         crc_bytes = bytearray([crc & 255, (crc >> 8) & 255])  # Convert CRC to bytearray
         return byte_buffer + crc_bytes
+
+
+def _signed(value: int) -> int:
+    return (256 - value) * (-1) if value > 127 else value
+
+
+def _decode_status(status: bytes) -> dict[str, Any]:
+    # only the preset temperature and the error code need the sign of a byte,
+    # the masks of the other fields give the same bits for unsigned bytes
+    code = status[6] & 127
+    return {
+        # get the current ac operation (3th value and with byte 3)
+        "Operation": 1 == (3 & status[2]),
+        # get preset temp: 5th byte divided by 2
+        "PresetTemp": _signed(status[4]) / 2,
+        # get operation mode: check if 3th byte and byte 60 matches 8,16,12 or 4
+        "OperationMode": _DECODE_OPERATION_MODE.get(60 & status[2], 0),
+        "AirFlow": _DECODE_AIRFLOW.get(15 & status[3], -1),
+        "WindDirectionUD": (
+            0
+            if status[2] & 192 == 64
+            else _DECODE_WIND_DIRECTION_UD.get(240 & status[3], 0)
+        ),
+        "WindDirectionLR": (
+            0
+            if status[12] & 3 == 1
+            else _DECODE_WIND_DIRECTION_LR.get(31 & status[11], 0)
+        ),
+        "Entrust": 4 == (12 & status[12]),
+        "CoolHotJudge": (status[8] & 8) <= 0,
+        "ModelNr": _DECODE_MODEL_NR.get(status[0] & 127, -1),
+        "Vacant": (status[10] & 1) != 0,
+        "ErrorCode": (
+            "00"
+            if code == 0
+            else f"M{code:02d}"
+            if (_signed(status[6]) & -128) <= 0
+            else "E" + str(code)
+        ),
+    }
+
+
+# tags of the sensor records, the first two bytes of a record
+TAG_OUTDOOR_TEMP = "8010"
+TAG_INDOOR_TEMP = "8020"
+TAG_ELECTRIC = "9410"
+
+# the tag bytes and the little endian value of a record
+_RECORD = struct.Struct("<2sH")
+_OUTDOOR_TEMP = bytes.fromhex(TAG_OUTDOOR_TEMP)
+_INDOOR_TEMP = bytes.fromhex(TAG_INDOOR_TEMP)
+_ELECTRIC = bytes.fromhex(TAG_ELECTRIC)
+
+
+@functools.cache
+def _wanted_tags(unknown_tags: frozenset[str]) -> frozenset[bytes]:
+    return frozenset(map(bytes.fromhex, unknown_tags)) | {
+        _OUTDOOR_TEMP,
+        _INDOOR_TEMP,
+        _ELECTRIC,
+    }
+
+
+def _decode_records(
+    records: bytes, unknown_tags: frozenset[str] | None
+) -> dict[str, Any]:
+    if unknown_tags is None:
+        # every tag is kept, the last record of a tag wins like it always did
+        values = dict(_RECORD.iter_unpack(records))
+    else:
+        # the modules send a tag once, stop at the last of the wanted tags
+        wanted = _wanted_tags(unknown_tags)
+        values = {}
+        for tag, value in _RECORD.iter_unpack(records):
+            if tag in wanted and tag not in values:
+                values[tag] = value
+                if len(values) == len(wanted):
+                    break
+    outdoor = values.pop(_OUTDOOR_TEMP, None)
+    indoor = values.pop(_INDOOR_TEMP, None)
+    electric = values.pop(_ELECTRIC, None)
+
+    fields: dict[str, Any] = {
+        "Electric": None if electric is None else electric * 0.25,
+        "UnknownRecords": {tag.hex(): value for tag, value in values.items()},
+    }
+    if outdoor is not None:
+        fields["OutdoorTemp"] = outdoorTempList[outdoor & 0xFF]
+    if indoor is not None:
+        fields["IndoorTemp"] = indoorTempList[indoor & 0xFF]
+    return fields
+
+
+@dataclass(slots=True)
+class _DecodedFrame:
+    """Source bytes and decoded fields of the previous frame"""
+
+    status: bytes
+    records: bytes
+    status_fields: dict[str, Any]
+    record_fields: dict[str, Any]
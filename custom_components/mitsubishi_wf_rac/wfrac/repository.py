@@ -5,23 +5,25 @@ from __future__ import annotations
 import time
 import logging
 import asyncio
-import functools
 
 from typing import Any
 from datetime import datetime, timedelta
-from homeassistant.core import HomeAssistant
 
-import requests
+from .transport import RecordingTransport, TrafficRecorder, Transport
 
 _LOGGER = logging.getLogger(__name__)
-# log http requests/responses to separate logger, to allow easily turning on/off from
-# configuration.yaml
-_HTTP_LOG = _LOGGER.getChild("http")
 
 # ensure that we don't overwhelm the aircon unit by waiting at least
 # this long between successive requests
 _MIN_TIME_BETWEEN_REQUESTS = timedelta(seconds=1)
 
+# upper bound for a single request, including waiting for the mutex and pacing
+_REQUEST_DEADLINE = timedelta(seconds=30)
+
+
+class RequestCancelledError(Exception):
+    """Raised when a pending request is cancelled because the repository closed"""
+
 
 class Repository:
     """Simple Api class to send and get Aircon information"""
@@ -30,24 +32,45 @@ class Repository:
 
     def __init__(  # pylint: disable=too-many-arguments
         self,
-        hass: HomeAssistant,
+        transport: Transport,
         hostname: str,
         port: int,
         operator_id: str,
         device_id: str,
+        min_time_between_requests: timedelta = _MIN_TIME_BETWEEN_REQUESTS,
     ) -> None:
-        self._hass = hass
         self._hostname = hostname
         self._port = port
         self._operator_id = operator_id
         self._device_id = device_id
         self._mutex = asyncio.Lock()
         self._next_request_after = datetime.now()
+        self._min_time_between_requests = min_time_between_requests
+        self._transport = transport
+        self._pending: set[asyncio.Task] = set()
 
     async def _post(
         self, command: str, contents: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        url = f"http://{self._hostname}:{self._port}/beaver/command/{command}"
+        # run every request as its own task, so it can be cancelled on close
+        # without cancelling the caller
+        task = asyncio.create_task(self._request(command, contents))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+            raise RequestCancelledError(
+                f"Request {command} to {self._hostname} was cancelled"
+            ) from None
+
+    async def _request(
+        self, command: str, contents: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         data = {
             "apiVer": self.api_version,
             "command": command,
@@ -58,32 +81,63 @@ class Repository:
         if contents is not None:
             data["contents"] = contents
 
-        # ensure only one thread is talking to the device at a time
-        async with self._mutex:
-            wait_for = (self._next_request_after - datetime.now()).total_seconds()
-            if wait_for > 0:
-                _LOGGER.debug("Waiting for %rs until we can send a request", wait_for)
-                await asyncio.sleep(wait_for)
-
-            _HTTP_LOG.debug("POSTing to %s: %r", url, data)
-            response = await self._hass.async_add_executor_job(
-                functools.partial(requests.post, url, json=data, timeout=30)
-            )
+        async with asyncio.timeout(_REQUEST_DEADLINE.total_seconds()):
+            # ensure only one request is talking to the device at a time
+            async with self._mutex:
+                wait_for = (self._next_request_after - datetime.now()).total_seconds()
+                if wait_for > 0:
+                    _LOGGER.debug(
+                        "Waiting for %rs until we can send a request", wait_for
+                    )
+                    await asyncio.sleep(wait_for)
+
+                try:
+                    result = await self._transport.post(
+                        self._hostname, self._port, command, data
+                    )
+                finally:
+                    # remember to set the next request time before we release the lock!
+                    self._next_request_after = (
+                        datetime.now() + self._min_time_between_requests
+                    )
+
+        return result
+
+    @property
+    def hostname(self) -> str:
+        """Return the host the requests are sent to"""
+        return self._hostname
+
+    @hostname.setter
+    def hostname(self, hostname: str) -> None:
+        """Send subsequent requests to a different host"""
+        self._hostname = hostname
 
-            _HTTP_LOG.debug(
-                "Got response (%r) from %r: %r",
-                response.status_code,
-                self._hostname,
-                response.text,
+    @property
+    def transport(self) -> Transport:
+        """Return the transport the requests are sent with"""
+        return self._transport
+
+    def start_recording(self, recorder: TrafficRecorder) -> None:
+        """Record every exchange with the airco to recorder"""
+        self.stop_recording()
+        self._transport = RecordingTransport(self._transport, recorder)
+
+    def stop_recording(self) -> None:
+        """Stop recording the exchanges with the airco"""
+        if isinstance(self._transport, RecordingTransport):
+            self._transport = self._transport.transport
+
+    async def async_close(self) -> None:
+        """Cancel all pending requests and wait for them to finish"""
+        pending = list(self._pending)
+        for task in pending:
+            task.cancel()
+        if pending:
+            _LOGGER.debug(
+                "Cancelled %d pending request(s) to %s", len(pending), self._hostname
             )
-
-            # remember to set the next request time before we release the lock!
-            self._next_request_after = datetime.now() + _MIN_TIME_BETWEEN_REQUESTS
-
-        # raise an exception if the airco returned an error, let the caller figure it out
-        response.raise_for_status()
-
-        return response.json()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def get_info(self) -> dict:
         """Simple command to get aircon details"""
@@ -0,0 +1,206 @@
+"""Transports that carry the requests of the Repository"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+from collections import defaultdict, deque
+from datetime import timedelta
+import json
+import logging
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+# log http requests/responses to separate logger, to allow easily turning on/off from
+# configuration.yaml
+_HTTP_LOG = logging.getLogger(__name__.rsplit(".", 1)[0] + ".repository.http")
+
+# the module either answers quickly or not at all, so don't wait too long for it
+_CONNECT_TIMEOUT = timedelta(seconds=5)
+_READ_TIMEOUT = timedelta(seconds=10)
+
+# recorded exchanges are written to the file in batches of this size
+_RECORD_FLUSH_SIZE = 100
+
+
+class ReplayError(Exception):
+    """Raised for an exchange that failed while it was recorded, or is missing"""
+
+
+class Transport(abc.ABC):
+    """Sends a command with its request data to an airco and returns the reply"""
+
+    @abc.abstractmethod
+    async def post(
+        self, host: str, port: int, command: str, data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Send data to the airco at host and port, return the decoded reply"""
+
+    async def async_close(self) -> None:
+        """Release what the transport holds"""
+
+
+class HttpTransport(Transport):
+    """Transport over HTTP, the way the airco modules talk"""
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        # only needed to talk to real airco's, replaying works without aiohttp
+        import aiohttp  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        self._session = session
+        self._timeout = aiohttp.ClientTimeout(
+            connect=_CONNECT_TIMEOUT.total_seconds(),
+            sock_read=_READ_TIMEOUT.total_seconds(),
+        )
+
+    async def post(
+        self, host: str, port: int, command: str, data: dict[str, Any]
+    ) -> dict[str, Any]:
+        url = f"http://{host}:{port}/beaver/command/{command}"
+        _HTTP_LOG.debug("POSTing to %s: %r", url, data)
+        async with self._session.post(
+            url, json=data, timeout=self._timeout
+        ) as response:
+            text = await response.text()
+
+            _HTTP_LOG.debug(
+                "Got response (%r) from %r: %r", response.status, host, text
+            )
+
+            # raise an exception if the airco returned an error, let the caller figure it out
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+class TrafficRecorder:
+    """Writes exchanges as JSON lines, shared by the RecordingTransports"""
+
+    def __init__(self, path: str | Path, flush_size: int = _RECORD_FLUSH_SIZE) -> None:
+        self._path = Path(path)
+        self._flush_size = flush_size
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+        self._flushes: set[asyncio.Task] = set()
+
+    @property
+    def path(self) -> Path:
+        """File the exchanges are appended to"""
+        return self._path
+
+    def record(self, exchange: dict[str, Any]) -> None:
+        """Buffer an exchange, written to the file in the background"""
+        self._buffer.append(json.dumps(exchange, separators=(",", ":")))
+        if len(self._buffer) >= self._flush_size:
+            task = asyncio.get_running_loop().create_task(self.async_flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def async_flush(self) -> None:
+        """Write the buffered exchanges, without blocking the event loop"""
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write, lines
+                )
+
+    def _write(self, lines: list[str]) -> None:
+        with self._path.open("a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def async_close(self) -> None:
+        """Write everything that is still buffered"""
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.async_flush()
+
+
+class RecordingTransport(Transport):
+    """Passes requests on to another transport and records every exchange"""
+
+    def __init__(self, transport: Transport, recorder: TrafficRecorder) -> None:
+        self._transport = transport
+        self._recorder = recorder
+
+    @property
+    def transport(self) -> Transport:
+        """The transport that does the actual requests"""
+        return self._transport
+
+    async def post(
+        self, host: str, port: int, command: str, data: dict[str, Any]
+    ) -> dict[str, Any]:
+        exchange: dict[str, Any] = {
+            "time": time.time(),
+            "host": host,
+            "port": port,
+            "command": command,
+            "contents": data.get("contents"),
+        }
+        start = time.monotonic()
+        try:
+            response = await self._transport.post(host, port, command, data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            exchange["latency"] = round(time.monotonic() - start, 4)
+            exchange["error"] = repr(error)
+            self._recorder.record(exchange)
+            raise
+
+        exchange["latency"] = round(time.monotonic() - start, 4)
+        exchange["response"] = response
+        self._recorder.record(exchange)
+        return response
+
+
+class ReplayTransport(Transport):
+    """Serves recorded replies, in recorded order per airco and command.
+
+    Every reply takes its recorded latency divided by speed, a speed of None
+    replies at once. The recordings of an airco and command start over when
+    they run out.
+    """
+
+    def __init__(
+        self, exchanges: list[dict[str, Any]], speed: float | None = 1.0
+    ) -> None:
+        self._exchanges = exchanges
+        self._speed = speed
+        self._replies: dict[tuple[str, str], deque[dict[str, Any]]] = defaultdict(
+            deque
+        )
+        for exchange in exchanges:
+            self._replies[(exchange["host"], exchange["command"])].append(exchange)
+
+    @classmethod
+    def load(cls, path: str | Path, speed: float | None = 1.0) -> ReplayTransport:
+        """Replay the exchanges recorded in the file at path"""
+        with Path(path).open(encoding="utf-8") as file:
+            exchanges = [json.loads(line) for line in file if line.strip()]
+        return cls(exchanges, speed)
+
+    @property
+    def exchanges(self) -> list[dict[str, Any]]:
+        """All recorded exchanges, in the order they were recorded"""
+        return self._exchanges
+
+    async def post(
+        self, host: str, port: int, command: str, data: dict[str, Any]
+    ) -> dict[str, Any]:
+        replies = self._replies.get((host, command))
+        if not replies:
+            raise ReplayError(f"No recorded {command} for {host}")
+
+        exchange = replies[0]
+        replies.rotate(-1)
+        if self._speed:
+            await asyncio.sleep(exchange.get("latency", 0) / self._speed)
+        if "error" in exchange:
+            raise ReplayError(exchange["error"])
+        return exchange["response"]
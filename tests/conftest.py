@@ -0,0 +1,16 @@
+"""Make the wfrac client importable for the tests, see benchmarks/wfrac_loader.py
+
+The integration itself is imported as custom_components.mitsubishi_wf_rac,
+from the root of the checkout, its tests are skipped without Home Assistant.
+"""
+
+from pathlib import Path
+import runpy
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+runpy.run_path(str(ROOT / "benchmarks" / "wfrac_loader.py"))["load_wfrac"]()
+# appended, nothing in the root shadows an installed module
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
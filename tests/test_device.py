@@ -0,0 +1,123 @@
+"""Tests for the Device, against replayed airco replies."""
+
+import asyncio
+from datetime import timedelta
+import json
+from pathlib import Path
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from wfrac import device as device_module
+from wfrac.device import QUEUED_COMMAND_MAX_AGE, Device
+from wfrac.models.aircon import AirconCommands
+from wfrac.transport import ReplayTransport
+
+CORPUS = Path(__file__).resolve().parent.parent / "benchmarks" / "parser_corpus.json"
+HOST = "10.0.0.1"
+COMMAND_FAILS = {"host": HOST, "command": "setAirconStat", "error": "timeout"}
+
+
+def _frames() -> list[str]:
+    cases = json.loads(CORPUS.read_text(encoding="utf-8"))["cases"]
+    return [case["airconStat"] for case in cases]
+
+
+def _status(frame: str) -> dict:
+    return {
+        "host": HOST,
+        "command": "getAirconStat",
+        "response": {
+            "contents": {
+                "airconStat": frame,
+                "numOfAccount": 1,
+                "firmType": "WF-RAC",
+                "mcu": {"firmVer": "0"},
+                "wireless": {"firmVer": "0"},
+            }
+        },
+    }
+
+
+def _device(exchanges: list[dict]) -> Device:
+    device = Device(
+        ReplayTransport(exchanges, speed=None),
+        "airco",
+        HOST,
+        51443,
+        "device",
+        "operator",
+        "airco",
+    )
+    # replies come at once, don't space the requests
+    device.repository._min_time_between_requests = timedelta(0)
+    return device
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch) -> list[float]:
+    """The monotonic time the device sees, set by the test"""
+    clock = [1000.0]
+    monkeypatch.setattr(
+        device_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock[0], time=time.time),
+    )
+    return clock
+
+
+def test_failed_retry_keeps_the_age_of_queued_params(clock):
+    max_age = QUEUED_COMMAND_MAX_AGE.total_seconds()
+    # the airco answers polls, but every command fails
+    device = _device([_status(_frames()[0]), COMMAND_FAILS])
+
+    async def run() -> None:
+        await device.update(no_throttle=True)
+        assert not await device.set_airco({AirconCommands.PresetTemp: 22.0})
+
+        # still young enough to be sent along with the next command
+        clock[0] += max_age - 10
+        assert not await device.set_airco({AirconCommands.AirFlow: 2})
+
+        # the temperature was first queued longer ago than max_age
+        clock[0] += 20
+        assert not await device.set_airco({AirconCommands.Operation: True})
+
+    asyncio.run(run())
+    assert AirconCommands.PresetTemp not in device._queued_params
+    assert device._queued_params.keys() == {
+        AirconCommands.AirFlow,
+        AirconCommands.Operation,
+    }
+
+
+def test_newer_value_restarts_the_age(clock):
+    device = _device([_status(_frames()[0]), COMMAND_FAILS])
+
+    async def run() -> None:
+        await device.update(no_throttle=True)
+        await device.set_airco({AirconCommands.PresetTemp: 22.0})
+        clock[0] += QUEUED_COMMAND_MAX_AGE.total_seconds() - 10
+        await device.set_airco({AirconCommands.PresetTemp: 23.0})
+        clock[0] += 20
+        await device.set_airco({AirconCommands.AirFlow: 2})
+
+    asyncio.run(run())
+    assert device._queued_params[AirconCommands.PresetTemp] == 23.0
+
+
+def test_corrupted_frame_keeps_the_previous_values():
+    frames = _frames()
+    corrupted = frames[2][:-4] + "AAA="  # the CRC of the second segment is wrong
+    device = _device([_status(frames[1]), _status(corrupted)])
+
+    async def run() -> None:
+        await device.update(no_throttle=True)
+        before = vars(device.airco)
+        await device.update(no_throttle=True)
+        assert vars(device.airco) == before
+
+    asyncio.run(run())
+    assert device.rejected_frames == 1
+    assert device.available
@@ -0,0 +1,50 @@
+"""Tests for the power estimate from the energy counter."""
+
+from wfrac.energy import PowerEstimator
+
+
+def _steady(estimator: PowerEstimator) -> None:
+    """A 1 kW load: the counter steps 0.25 kWh every 15 minutes"""
+    for i in range(5):
+        estimator.add(i * 900.0, 10 + i * 0.25)
+
+
+def test_no_estimate_before_the_counter_steps():
+    estimator = PowerEstimator()
+    estimator.add(0.0, 10.0)
+    assert estimator.power(100.0) is None
+
+
+def test_steady_load():
+    estimator = PowerEstimator()
+    _steady(estimator)
+    assert estimator.power(3600.0) == 1000
+    # the next step is not due yet
+    assert estimator.power(3600.0 + 600) == 1000
+
+
+def test_flat_counter_lowers_the_estimate():
+    estimator = PowerEstimator()
+    _steady(estimator)
+    estimator.add(4000.0, 11.0)  # read again, no step
+
+    powers = [estimator.power(3600.0 + t) for t in (1200, 1800, 3000)]
+    assert powers == sorted(powers, reverse=True)
+    assert powers[0] < 1000
+    # no step within the window, the airco uses nothing
+    assert estimator.power(3600.0 + 3601) == 0
+
+
+def test_flat_counter_after_a_single_step():
+    estimator = PowerEstimator()
+    estimator.add(0.0, 10.0)
+    estimator.add(900.0, 10.25)
+    assert estimator.power(1000.0) is None
+    assert estimator.power(900.0 + 3601) == 0
+
+
+def test_counter_restart():
+    estimator = PowerEstimator()
+    _steady(estimator)
+    estimator.add(4500.0, 0.25)
+    assert estimator.power(4500.0) == 1000
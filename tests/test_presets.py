@@ -0,0 +1,107 @@
+"""Tests for finding the preset mode that matches the climate state."""
+
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from homeassistant.components.climate.const import FAN_AUTO, HVACMode  # noqa: E402
+
+from custom_components.mitsubishi_wf_rac import (  # noqa: E402
+    MitsubishiWfRacData,
+    PresetMode,
+)
+from custom_components.mitsubishi_wf_rac.const import (  # noqa: E402
+    SWING_3D_AUTO,
+    SWING_HORIZONTAL_POSITION_1,
+    SWING_HORIZONTAL_POSITION_2,
+    SWING_VERTICAL_POSITION_1,
+)
+
+HIGH = SWING_VERTICAL_POSITION_1
+LEFT = SWING_HORIZONTAL_POSITION_1
+MIDDLE = SWING_HORIZONTAL_POSITION_2
+
+
+class _Device:
+    """Keeps the command parameters of the preset frames"""
+
+    def __init__(self) -> None:
+        self.frame_params: dict[int, dict[str, Any]] = {}
+
+    def set_frame_params(self, key: int, params: dict[str, Any]) -> None:
+        self.frame_params[key] = params
+
+    def remove_frame_params(self, key: int) -> None:
+        self.frame_params.pop(key, None)
+
+
+def _preset(name: str, hvac_mode=HVACMode.HEAT, temperature=21.0, **swing):
+    return PresetMode(
+        name,
+        FAN_AUTO,
+        swing.get("vertical", HIGH),
+        swing.get("horizontal", LEFT),
+        hvac_mode,
+        temperature,
+    )
+
+
+def _data(*presets: PresetMode) -> MitsubishiWfRacData:
+    return MitsubishiWfRacData(
+        _Device(), {i: preset for i, preset in enumerate(presets, 1)}, None
+    )
+
+
+def test_matching_preset_is_found():
+    data = _data(_preset("home"), _preset("boost", temperature=25.0))
+    assert data.find_preset_mode(HVACMode.HEAT, 25.0, FAN_AUTO, HIGH, LEFT) == "boost"
+    assert data.find_preset_mode(HVACMode.HEAT, 21.0, FAN_AUTO, HIGH, LEFT) == "home"
+    assert data.find_preset_mode(HVACMode.HEAT, 22.0, FAN_AUTO, HIGH, LEFT) is None
+
+
+def test_lowest_number_wins_a_tie():
+    data = _data(_preset("away", temperature=16.0), _preset("home"), _preset("comfort"))
+    assert data.find_preset_mode(HVACMode.HEAT, 21.0, FAN_AUTO, HIGH, LEFT) == "home"
+
+
+def test_3d_auto_ignores_the_horizontal_swing():
+    data = _data(_preset("home", vertical=SWING_3D_AUTO, horizontal=LEFT))
+    assert (
+        data.find_preset_mode(HVACMode.HEAT, 21.0, FAN_AUTO, SWING_3D_AUTO, MIDDLE)
+        == "home"
+    )
+
+
+def test_off_preset_matches_any_state_of_an_airco_that_is_off():
+    data = _data(_preset("home"), _preset("away", HVACMode.OFF))
+    assert data.find_preset_mode(HVACMode.OFF, 18.0, FAN_AUTO, HIGH, MIDDLE) == "away"
+    assert data.find_preset_mode(HVACMode.HEAT, 18.0, FAN_AUTO, HIGH, MIDDLE) is None
+
+
+def test_lowest_number_wins_between_an_off_preset_and_a_state():
+    off_first = _data(_preset("away", HVACMode.OFF), _preset("home"))
+    assert (
+        off_first.find_preset_mode(HVACMode.OFF, 21.0, FAN_AUTO, HIGH, LEFT) == "away"
+    )
+
+    state_first = _data(_preset("home"), _preset("away", HVACMode.OFF))
+    assert (
+        state_first.find_preset_mode(HVACMode.OFF, 21.0, FAN_AUTO, HIGH, LEFT) == "home"
+    )
+
+
+def test_off_presets_share_one_entry():
+    data = _data(_preset("night", HVACMode.OFF), _preset("away", HVACMode.OFF))
+    assert data.find_preset_mode(HVACMode.OFF, None, None, None, None) == "night"
+
+
+def test_index_follows_an_edited_preset():
+    data = _data(_preset("home"))
+    data.preset_modes[1].temperature = 23.0
+    data.update_presets()
+    assert data.find_preset_mode(HVACMode.HEAT, 21.0, FAN_AUTO, HIGH, LEFT) is None
+    assert data.find_preset_mode(HVACMode.HEAT, 23.0, FAN_AUTO, HIGH, LEFT) == "home"
+    assert data.device.frame_params[1]
@@ -0,0 +1,107 @@
+"""Tests for decoding airconStat frames."""
+
+from base64 import b64decode, b64encode
+from binascii import crc_hqx
+import json
+from pathlib import Path
+
+import pytest
+
+from wfrac.rac_parser import InvalidFrameError, RacParser, validate_frame
+
+CORPUS = Path(__file__).resolve().parent.parent / "benchmarks" / "parser_corpus.json"
+
+
+def _frames() -> list[str]:
+    cases = json.loads(CORPUS.read_text(encoding="utf-8"))["cases"]
+    return [case["airconStat"] for case in cases]
+
+
+def _second_segment(frame: str) -> tuple[bytes, bytearray]:
+    """The first segment and the second one without its CRC"""
+    raw = b64decode(frame)
+    start = raw[18] * 4 + 21
+    return raw[:start], bytearray(raw[start:-2])
+
+
+def _join(first: bytes, second: bytearray) -> str:
+    crc = crc_hqx(second, 0xFFFF)
+    return b64encode(first + second + bytes([crc & 255, crc >> 8])).decode()
+
+
+def _decoded(parser: RacParser, frame: str) -> dict:
+    return vars(parser.translate_bytes(frame))
+
+
+def test_changed_status_is_decoded_again():
+    frame = _frames()[1]
+    first, second = _second_segment(frame)
+    second[2] ^= 0x01  # switch the airco on or off
+    changed = _join(first, second)
+
+    parser = RacParser()
+    _decoded(parser, frame)
+    assert _decoded(parser, changed) == _decoded(RacParser(), changed)
+    assert _decoded(parser, changed) != _decoded(RacParser(), frame)
+
+
+def test_changed_record_is_decoded_again():
+    frame = _frames()[1]
+    first, second = _second_segment(frame)
+    second[21] ^= 0x01  # the value of the first record
+    changed = _join(first, second)
+
+    parser = RacParser()
+    _decoded(parser, frame)
+    assert _decoded(parser, changed) == _decoded(RacParser(), changed)
+    assert _decoded(parser, changed) != _decoded(RacParser(), frame)
+
+
+def test_incremental_decode_of_the_corpus():
+    parser = RacParser()
+    for frame in _frames():
+        assert _decoded(parser, frame) == _decoded(RacParser(), frame)
+
+
+def test_carried_over_unknown_records_are_not_shared():
+    frame = _frames()[2]
+    parser = RacParser()
+    first = parser.translate_bytes(frame)
+    first.UnknownRecords.clear()
+    assert parser.translate_bytes(frame).UnknownRecords
+
+
+def test_valid_frames_pass():
+    for frame in _frames():
+        validate_frame(b64decode(frame))
+
+
+@pytest.mark.parametrize(
+    ("change", "message"),
+    [
+        (lambda raw: raw[:20], "first segment is truncated"),
+        (lambda raw: raw[:-1], "second segment is truncated"),
+        (lambda raw: raw[:3] + bytes([raw[3] ^ 0x01]) + raw[4:], "first segment has"),
+        (lambda raw: raw[:-1] + bytes([raw[-1] ^ 0x01]), "second segment has"),
+        (lambda raw: raw + b"\x00", "1 bytes after the second segment"),
+    ],
+    ids=["first-length", "second-length", "first-crc", "second-crc", "trailing"],
+)
+def test_invalid_frames_are_rejected(change, message):
+    raw = change(b64decode(_frames()[1]))
+    with pytest.raises(InvalidFrameError, match=message):
+        validate_frame(raw)
+    with pytest.raises(InvalidFrameError, match=message):
+        RacParser().translate_bytes(b64encode(raw).decode())
+
+
+def test_record_count_beyond_the_frame_is_rejected():
+    first, second = _second_segment(_frames()[1])
+    second[18] += 1  # one record more than the frame holds
+    with pytest.raises(InvalidFrameError, match="second segment is truncated"):
+        RacParser().translate_bytes(_join(first, second))
+
+
+def test_not_base64_is_rejected():
+    with pytest.raises(InvalidFrameError, match="not base64"):
+        RacParser().translate_bytes("not base64!")